@@ -2,27 +2,173 @@ import asyncio
 import logging
 import time
 from asyncio import CancelledError, shield
-from typing import List, Tuple
-
-import requests
+from concurrent.futures import Executor
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
+from .Cache import *
+from .Decoder import decode
 from .Exceptions import *
 from .Item import *
+from .ItemStore import *
+from .Ledger import *
+from .Metrics import *
+from .RateLimiter import *
+from .Resilience import *
+from .Transport import *
 from .types import *
 
 __all__ = ['CSGOMarketAPI']
 
+# запрос одной пачки MassInfo: (items, sell, buy, history, info) -> results
+MassInfoBatch = Callable[[MassInfoListType, int, int, int, int], Awaitable[List[dict]]]
+
 
 class CSGOMarketAPI:
+    MASS_INFO_LIMIT = 100
+    ITEM_INFO_FIELDS = ('market_name', 'market_hash_name', 'hash', 'description', 'tags', 'our_market_instanceid')
+    ONLINE_RETRY_DELAY = 10
+    # ответы короче разбираются в цикле событий: передача в пул дороже самого разбора
+    OFFLOAD_THRESHOLD = 256 * 1024
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, transport: BaseTransport = None, cache: ResponseCache = None,
+                 item_store: ItemStore = None, executor: Executor = None) -> None:
         """
         :param api_key: API key
+        :param transport: async transport, by default AiohttpTransport with own connection pool.
+        :param cache: optional cache for offers, history and item info responses.
+        :param item_store: optional persistent cache of item metadata for mass_info.
+        :param executor: optional thread or process pool for decoding responses longer than
+            OFFLOAD_THRESHOLD, so that concurrent large responses do not block the event loop one after another.
         """
         self.MAX_REQUESTS = 4
         self.API_KEY = api_key
-        self.balance = -1
-        self.request_counter = 0
+        self.ledger = BalanceLedger()
+        self.limiter = RateLimiter(self.MAX_REQUESTS)
+        self.transport = transport if transport is not None else AiohttpTransport()
+        self.sync_transport = SyncTransport()
+        self.cache = cache
+        self.item_store = item_store
+        self.executor = executor
+        self.retry_policies = dict(DEFAULT_RETRY_POLICIES)
+        self.default_retry_policy = RetryPolicy()
+        self.breaker = CircuitBreaker()
+        self.metrics = Metrics()
+        self.closing = False
+        self._sending = 0
+        self._drained: Optional[asyncio.Future] = None
+        self._aborted_orders: List[Tuple[Item, int]] = []
+        self.metrics.add_source('limiter', lambda: self.limiter.stats())
+        if cache is not None:
+            self.metrics.add_source('cache', cache.stats)
+        if item_store is not None:
+            self.metrics.add_source('item_store', item_store.stats)
+
+    @property
+    def balance(self) -> int:
+        """Последний подтвержденный баланс в копейках, -1 если он еще не запрашивался."""
+        return self.ledger.balance
+
+    @balance.setter
+    def balance(self, value: int) -> None:
+        self.ledger.sync(value)
+
+    async def __aenter__(self) -> 'CSGOMarketAPI':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Закрывает пул соединений клиента."""
+        await self.transport.close()
+        self.sync_transport.close()
+
+    async def _request(self, url: str, data: Optional[dict] = None, priority: Priority = Priority.DEFAULT,
+                       fields: Sequence[str] = None) -> Tuple[Response, dict]:
+        """
+        Отправляет запрос с повторами по политике метода API.
+
+        Временные ошибки (502, обрыв соединения) повторяются с экспоненциальной задержкой,
+        каждая попытка заново занимает слот в лимитере. Пока API недоступно, предохранитель
+        задерживает некритичные запросы.
+
+        :param url: request URI.
+        :param data: form data, if passed request is sent with POST method.
+        :param priority: priority in limiter queue.
+        :param fields: decode only these top level fields of response, see :meth:`validate_response`.
+        :return: (Response, JSON like dict from response)
+        """
+        endpoint = self._endpoint(url)
+        policy = self.retry_policies.get(endpoint, self.default_retry_policy)
+        attempt = 0
+        while True:
+            probe = await self.breaker.wait(priority)
+            try:
+                result = await self._send(url, data, priority, endpoint, fields)
+            except policy.retry_on as e:
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt >= policy.max_attempts:
+                    raise
+                delay = policy.delay(attempt)
+                logging.warning('%s failed (%s), retry %d in %.2f s', endpoint, type(e).__name__, attempt, delay)
+                await asyncio.sleep(delay)
+            except Error:
+                self.breaker.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                if probe:
+                    self.breaker.end_probe()
+
+    async def _send(self, url: str, data: Optional[dict], priority: Priority, endpoint: str,
+                    fields: Sequence[str] = None) -> Tuple[Response, dict]:
+        """Одна попытка запроса: слот лимитера, транспорт и проверка ответа с записью метрик."""
+        if self.closing and priority != Priority.CRITICAL:
+            raise ShutdownError()
+        hooks = self.metrics.sample_hooks()
+        for hook in hooks:
+            hook.before(endpoint)
+        started = time.perf_counter()
+        error = None
+        self._sending += 1
+        try:
+            wait = await self.limiter.acquire(priority)
+            sent = time.perf_counter()
+            try:
+                if data is None:
+                    response = await self.transport.get(url)
+                else:
+                    response = await self.transport.post(url, data)
+            finally:
+                self.limiter.release()
+            received = time.perf_counter()
+            if self.executor is not None and len(response.content) >= self.OFFLOAD_THRESHOLD:
+                body = await self._validate_offloaded(response, fields)
+            else:
+                body = self.validate_response(response, fields)
+            self.metrics.observe(endpoint, wait, received - sent, len(response.content),
+                                 time.perf_counter() - received)
+            return response, body
+        except Exception as e:
+            error = e
+            self.metrics.observe_error(endpoint, e)
+            raise
+        finally:
+            self._sending -= 1
+            if not self._sending and self._drained is not None and not self._drained.done():
+                self._drained.set_result(None)
+            for hook in hooks:
+                hook.after(endpoint, time.perf_counter() - started, error)
+
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """Имя метода API из URI, например 'MassInfo'."""
+        path = urlsplit(url).path.strip('/').split('/')
+        return path[1] if path[0] == 'api' and len(path) > 1 else path[0]
 
     def set_api_key(self, api_key: str) -> str:
         """
@@ -34,87 +180,50 @@ class CSGOMarketAPI:
         self.API_KEY = api_key
         return self.API_KEY
 
-    async def refresh_request_counter_loop(self) -> None:
-        """Loop для обновления счетчика запросов."""
-
-        while True:
-            self.request_counter = 0
-            try:
-                await shield(asyncio.sleep(1))
-            except CancelledError:
-                return
-
     async def stay_online_loop(self) -> None:
         """Loop с отправкой ping_pong раз в 3 минуты"""
         while True:
             try:
-                await shield(self.ping_pong())
-                await shield(asyncio.sleep(3 * 60 - 5))
-            except BadGatewayError:
-                continue
+                try:
+                    await shield(self.ping_pong())
+                    delay = 3 * 60 - 5
+                except (BadGatewayError, NetworkError):
+                    delay = self.ONLINE_RETRY_DELAY
+                await shield(asyncio.sleep(delay))
             except CancelledError:
-                while True:
-                    try:
-                        await self.go_offline()
-                    except BadGatewayError:
-                        continue
-                    finally:
-                        break
+                try:
+                    await self.go_offline()
+                except (BadGatewayError, NetworkError):
+                    logging.error('Failed to go offline')
                 return
 
-    def request_possibility_check(func):
-        """Декоратор проверки возможности отправить запрос."""
-
-        async def magic(self, *args, **kwargs):
-            if asyncio.iscoroutinefunction(func):
-                while not self.request_possibility():
-                    await asyncio.sleep(0.3)
-                return await func(self, *args, **kwargs)
-            else:
-                if not self.request_possibility():
-                    # это нужно, чтобы предотвратить зависание программы
-                    # есть вероятность блокировки api ключа из-за превышения лимита запросов
-                    time.sleep(1)
-                return func(self, *args, **kwargs)
-
-        return magic
-
-    def balance_check(func):
-        """Декоратор для проверки баланса."""
+    @staticmethod
+    async def history(transport: BaseTransport = None):
+        """
+        Список последних 50 покупок со всей торговой площадки.
 
-        def magic(self, *args, **kwargs):
-            if 'price' not in kwargs:
-                price = args[1]
-            else:
-                price = kwargs['price']
-            if self.balance < price:
-                raise InsufficientFundsException()
-            return func(self, *args, **kwargs)
+        :param transport: transport for request, if not passed temporary AiohttpTransport is used.
+        """
 
-        return magic
+        uri = 'https://market.csgo.com/history/json/'
+        if transport is not None:
+            return CSGOMarketAPI.validate_response(await transport.get(uri))
+        transport = AiohttpTransport()
+        try:
+            return CSGOMarketAPI.validate_response(await transport.get(uri))
+        finally:
+            await transport.close()
 
-    def request_possibility(self) -> bool:
+    async def market_history(self, priority: Priority = Priority.BULK):
         """
-        Проверяет возможность отправки запроса, и обновляет счетчик.
+        Список последних 50 покупок со всей торговой площадки, как :meth:`history`,
+        но через лимитер, повторы и метрики клиента.
 
-        :return: bool
+        :param priority: priority in limiter queue.
         """
-        if self.request_counter < self.MAX_REQUESTS:
-            self.request_counter += 1
-            return True
-        else:
-            return False
-
-    @staticmethod
-    async def history():
-        """Список последних 50 покупок со всей торговой площадки."""
-
-        uri = 'https://market.csgo.com/history/json/'
-        response = requests.get(uri)
-        data = CSGOMarketAPI.validate_response(response)
+        response, data = await self._request('https://market.csgo.com/history/json/', priority=priority)
         return data
 
-    @request_possibility_check
     async def get_itemdb_uri(self) -> Tuple[str, str]:
         """
         Gets latest URI of db all items.
@@ -123,13 +232,11 @@ class CSGOMarketAPI:
         """
         logging.debug('get_itemdb_uri()')
         uri = f'https://market.csgo.com/itemdb/current_730.json'
-        response = requests.get(uri)
-        data = self.validate_response(response)
+        response, data = await self._request(uri)
         if 'db' in data:
             return f'https://market.csgo.com/itemdb/{data["db"]}', str(data['time'])
         raise UnknownError(response.text)
 
-    @request_possibility_check
     async def item_info(self, item: ImportItemType, language: str = 'ru') -> Item:
         """
         Returns info and offers for current item.
@@ -140,14 +247,19 @@ class CSGOMarketAPI:
         """
         if language not in ('ru', 'en'):
             raise AttributeError('`language` value must be one of (\'ru\', \'en\')')
-        uri = f'https://market.csgo.com/api/ItemInfo/{item["class_id"]}_{item["instance_id"]}/{language}/' \
-              f'?key={self.API_KEY}'
-        response = requests.get(uri)
-        data = self.validate_response(response)
-        # TODO написать в сохранение цен, стикеров и прочей информации в класс предмета
+        key = f'{item["class_id"]}_{item["instance_id"]}'
+        if self.cache is None:
+            return await self._item_info(key, language)
+        return await self.cache.get_or_fetch('ItemInfo', f'{key}/{language}', lambda: self._item_info(key, language))
+
+    async def _item_info(self, key: str, language: str) -> Item:
+        uri = f'https://market.csgo.com/api/ItemInfo/{key}/{language}/?key={self.API_KEY}'
+        response, data = await self._request(uri)
+        if self.item_store is not None and language == 'ru':
+            # MassInfo отдает названия на русском, поэтому сохраняются только ответы на этом языке
+            self.item_store.put_many({key: {field: data.get(field) for field in self.ITEM_INFO_FIELDS}}, 3)
         return Item.new_from_response_item_info(data)
 
-    @request_possibility_check
     async def mass_info(self, items: MassInfoListType, sell: int = 0, buy: int = 0,
                         history: int = 0, info: int = 2) -> List[Item]:
         """
@@ -173,6 +285,25 @@ class CSGOMarketAPI:
             3 - All info (description, tags from steam)
         :return: List of items with info.
         """
+        logging.debug('mass_info()')
+        return await self._collect_mass_info(self._mass_info_batch, items, sell, buy, history, info)
+
+    async def mass_info_iter(self, items: MassInfoListType, sell: int = 0, buy: int = 0,
+                             history: int = 0, info: int = 2) -> AsyncIterator[Item]:
+        """
+        Потоковый вариант mass_info: отдает предметы пачками по мере получения ответов.
+
+        Порядок предметов сохраняется внутри пачки, сами пачки приходят в порядке завершения запросов.
+        Параметры такие же, как у :meth:`mass_info`.
+
+        :return: async iterator of items with info.
+        """
+        logging.debug('mass_info_iter()')
+        async for item in self._stream_mass_info(self._mass_info_batch, items, sell, buy, history, info):
+            yield item
+
+    @staticmethod
+    def _check_mass_info_args(sell: int, buy: int, history: int, info: int) -> None:
         if sell not in (0, 1, 2):
             raise AttributeError('`sell` value must be one of (0, 1, 2)')
         if buy not in (0, 1, 2):
@@ -181,32 +312,100 @@ class CSGOMarketAPI:
             raise AttributeError('`history` value must be one of (0, 1, 2)')
         if info not in (0, 1, 2, 3):
             raise AttributeError('`info` value must be one of (0, 1, 2, 3)')
-        if len(items) > 100:
-            addiction_items = await self.mass_info(items[100:], sell, buy, history, info)
-        else:
-            addiction_items = []
-        logging.debug('mass_info()')
-        url = f'https://market.csgo.com/api/MassInfo/{sell}/{buy}/{history}/{info}?key={self.API_KEY}'
-        formatted_body = ','.join([f'{i["class_id"]}_{i["instance_id"]}' for i in items[:100]])
-        response = requests.post(url, {'list': formatted_body})
-        data = self.validate_response(response)
-        if 'success' in data and data['success']:
-            result = data['results']
-            # TODO написать в сохранение цен, стикеров и прочей информации в класс предмета
-            return [Item.new_from_mass_info(i) for i in result] + addiction_items
-        raise UnknownError(response.text)
 
-    async def _request_offers(self, item: Item or ImportItemType, method: str) -> dict:
+    @staticmethod
+    def _mass_info_tasks(batch: MassInfoBatch, items: MassInfoListType, sell: int, buy: int,
+                         history: int, info: int) -> List[asyncio.Task]:
+        """
+        Разбивает список на пачки по MASS_INFO_LIMIT предметов и запускает запросы по всем пачкам сразу.
+
+        :param batch: coroutine function which requests one batch, e.g. :meth:`_mass_info_batch`
+            or CSGOMarketPool dispatching batches to its keys.
+        """
+        limit = CSGOMarketAPI.MASS_INFO_LIMIT
+        return [asyncio.ensure_future(batch(items[i:i + limit], sell, buy, history, info))
+                for i in range(0, len(items), limit)]
+
+    @staticmethod
+    async def _collect_mass_info(batch: MassInfoBatch, items: MassInfoListType, sell: int, buy: int,
+                                 history: int, info: int) -> List[Item]:
+        """Общая часть mass_info клиента и пула: все пачки сразу, результат в порядке `items`."""
+        CSGOMarketAPI._check_mass_info_args(sell, buy, history, info)
+        tasks = CSGOMarketAPI._mass_info_tasks(batch, items, sell, buy, history, info)
+        try:
+            batches = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        result = []
+        for results in batches:
+            result.extend(Item.new_from_mass_info_results(results))
+        return result
+
+    @staticmethod
+    async def _stream_mass_info(batch: MassInfoBatch, items: MassInfoListType, sell: int, buy: int,
+                                history: int, info: int) -> AsyncIterator[Item]:
+        """Общая часть mass_info_iter клиента и пула: пачки в порядке завершения запросов."""
+        CSGOMarketAPI._check_mass_info_args(sell, buy, history, info)
+        tasks = CSGOMarketAPI._mass_info_tasks(batch, items, sell, buy, history, info)
+        try:
+            for next_batch in asyncio.as_completed(tasks):
+                for item in Item.new_from_mass_info_results(await next_batch):
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _mass_info_batch(self, items: MassInfoListType, sell: int, buy: int,
+                               history: int, info: int) -> List[dict]:
+        """
+        Один запрос MassInfo на пачку до MASS_INFO_LIMIT предметов.
+
+        Если запрошена только информация о предметах, она берется из item_store, и в запрос
+        попадают лишь отсутствующие там предметы. Полученная информация сохраняется в item_store.
+
+        :return: raw results in the order of `items`.
+        """
+        keys = [f'{i["class_id"]}_{i["instance_id"]}' for i in items]
+        store = self.item_store if info else None
+        cached = store.get_many(keys, info) if store is not None and not (sell or buy or history) else {}
+        missing = [key for key in keys if key not in cached] if cached else keys
+        results = {}
+        if missing:
+            url = f'https://market.csgo.com/api/MassInfo/{sell}/{buy}/{history}/{info}?key={self.API_KEY}'
+            response, data = await self._request(url, {'list': ','.join(missing)}, Priority.BULK,
+                                                 fields=('success', 'results'))
+            if not ('success' in data and data['success']):
+                raise UnknownError(response.text)
+            results = {f'{i["classid"]}_{i["instanceid"]}': i for i in data['results']}
+            if store is not None:
+                store.put_many({key: result['info'] for key, result in results.items() if 'info' in result}, info)
+        for key, value in cached.items():
+            class_id, instance_id = key.split('_')
+            results[key] = {'classid': class_id, 'instanceid': instance_id, 'info': value}
+        return [results[key] for key in keys if key in results]
+
+    async def _request_offers(self, item: Item or ImportItemType, method: str,
+                              priority: Priority = Priority.DEFAULT, fields: Sequence[str] = None) -> dict:
         """
         :param item: filled Item or {class_id: int, instance_id: int}.
         :param method: method name in uri like:
          f'https://market.csgo.com/api/{method}/{item["class_id"]}_{item["instance_id"]}/?key={self.API_KEY}'.
+        :param priority: priority in limiter queue.
+        :param fields: decode only these fields besides 'success', by default whole response.
         :return: dict with info.
         """
         if isinstance(item, Item):
             item = {'class_id': item.class_id, 'instance_id': item.instance_id}
-        uri = f'https://market.csgo.com/api/{method}/{item["class_id"]}_{item["instance_id"]}/?key={self.API_KEY}'
-        result, data = await self.request_with_boolean_response(uri)
+        key = f'{item["class_id"]}_{item["instance_id"]}'
+        if self.cache is None:
+            return await self._fetch_offers(key, method, priority, fields)
+        return await self.cache.get_or_fetch(method, key, lambda: self._fetch_offers(key, method, priority, fields))
+
+    async def _fetch_offers(self, key: str, method: str, priority: Priority, fields: Sequence[str] = None) -> dict:
+        uri = f'https://market.csgo.com/api/{method}/{key}/?key={self.API_KEY}'
+        result, data = await self.request_with_boolean_response(uri, priority, fields)
         if result:
             return data
         else:
@@ -219,7 +418,7 @@ class CSGOMarketAPI:
         :param item: filled Item or {class_id: int, instance_id: int}.
         :return: dict with info.
         """
-        return await self._request_offers(item, 'ItemHistory')
+        return await self._request_offers(item, 'ItemHistory', Priority.BULK)
 
     async def sell_offers(self, item: Item or ImportItemType) -> dict:
         """
@@ -237,7 +436,7 @@ class CSGOMarketAPI:
         :param item: filled Item or {class_id: int, instance_id: int}.
         :return: dict with info.
         """
-        return await self._request_offers(item, 'BestSellOffer')
+        return await self._request_offers(item, 'BestSellOffer', fields=('best_offer',))
 
     async def buy_offers(self, item: Item or ImportItemType) -> dict:
         """
@@ -255,9 +454,8 @@ class CSGOMarketAPI:
         :param item: filled Item or {class_id: int, instance_id: int}.
         :return: dict with info.
         """
-        return await self._request_offers(item, 'BestBuyOffer')
+        return await self._request_offers(item, 'BestBuyOffer', fields=('best_offer',))
 
-    @request_possibility_check
     async def get_money(self) -> int:
         """
         Обновляет баланс аккаунта.
@@ -266,41 +464,149 @@ class CSGOMarketAPI:
         """
         logging.debug('get_money()')
         url = f'https://market.csgo.com/api/GetMoney/?key={self.API_KEY}'
-        response = requests.get(url)
-        data = self.validate_response(response)
+        response, data = await self._request(url, fields=('money',))
         if 'money' in data:
-            self.balance = int(data['money'])
+            self.ledger.sync(int(data['money']))
             return int(data['money'])
         raise UnknownError(response)
 
-    @balance_check
+    async def refresh_balance(self, force: bool = False) -> int:
+        """
+        Сверяет баланс с GetMoney, только если локальный учет устарел или разошелся с сервером.
+
+        :param force: request balance anyway.
+        :return: Текущий баланс в копейках.
+        """
+        if force or self.ledger.needs_sync:
+            return await self.get_money()
+        return self.ledger.balance
+
     async def insert_order(self, item: Item, price: float) -> bool:
         """
         Вставляет новый ордер на покупку предмета.
 
         :param item: Экземпляр класса предмета.
         :param price: цена предмета в копейках.
+        :raises InsufficientFundsException: не хватает незарезервированных средств.
         :return: Результат выполнения.
         """
-        logging.debug(f'insert_order(class_id=\'{item.class_id}\', '
-                      f'instance_id=\'{item.instance_id}\', '
-                      f'price=\'{price}\', '
-                      f'hash=\'{item.hash}\')')
-        url = f'https://market.csgo.com/api/InsertOrder/{item.class_id}/{item.instance_id}' \
-              f'/{price}/{item.hash}/?key={self.API_KEY}'
-        return (await self.request_with_boolean_response(url))[0]
+        logging.debug("insert_order(class_id='%s', instance_id='%s', price='%s', hash='%s')",
+                      item.class_id, item.instance_id, price, item.hash)
+        return await self._submit_order(item, price, self._insert_order_url(item, price))
+
+    def _insert_order_url(self, item: Item, price: float) -> str:
+        return f'https://market.csgo.com/api/InsertOrder/{item.class_id}/{item.instance_id}' \
+               f'/{price}/{item.hash}/?key={self.API_KEY}'
 
-    @balance_check
     async def update_order(self, item: Item, price: float) -> bool:
         """
         Изменить/удалить запрос на автоматическую покупку предмета.
 
         :param item: Экземпляр класса предмета.
         :param price: Цена в копейках, целое число.
+        :raises InsufficientFundsException: не хватает незарезервированных средств.
         :return: Результат выполнения.
         """
-        url = f'https://market.csgo.com/api/UpdateOrder/{item.class_id}/{item.instance_id}/{price}/?key={self.API_KEY}'
-        return (await self.request_with_boolean_response(url))[0]
+        return await self._submit_order(item, price, self._update_order_url(item, price))
+
+    def _update_order_url(self, item: Item, price: float) -> str:
+        return f'https://market.csgo.com/api/UpdateOrder/{item.class_id}/{item.instance_id}/{price}/?key={self.API_KEY}'
+
+    async def insert_orders(self, orders: List[Tuple[Item, int]],
+                            priority: Priority = Priority.TRADE) -> List[OrderResult]:
+        """
+        Пакетно выставляет ордера на покупку.
+
+        Средства проверяются один раз на весь пакет: ордера, которые не помещаются в свободный
+        баланс по порядку списка, не отправляются. Остальные отправляются одновременно в рамках
+        лимита запросов, ошибка одного ордера не прерывает пакет.
+
+        :param orders: list of (Item, price in kopecks).
+        :param priority: priority in limiter queue, requests of one batch keep list order.
+        :return: results in the order of `orders`.
+        """
+        return await self._submit_orders(orders, self._insert_order_url, priority)
+
+    async def update_orders(self, orders: List[Tuple[Item, int]],
+                            priority: Priority = Priority.TRADE) -> List[OrderResult]:
+        """
+        Пакетно изменяет цены ордеров, параметры как у :meth:`insert_orders`.
+
+        :return: results in the order of `orders`.
+        """
+        return await self._submit_orders(orders, self._update_order_url, priority)
+
+    async def delete_orders(self, items: List[Item], priority: Priority = Priority.TRADE) -> List[OrderResult]:
+        """
+        Пакетно удаляет ордера.
+
+        :param items: items whose orders should be deleted.
+        :param priority: priority in limiter queue.
+        :return: results in the order of `items`.
+        """
+        return await self._submit_orders([(item, 0) for item in items], self._update_order_url, priority)
+
+    async def _submit_orders(self, orders: List[Tuple[Item, int]], url_factory,
+                             priority: Priority) -> List[OrderResult]:
+        available = self.ledger.available
+        reserved = self.ledger.reserved
+        tasks = []
+        for item, price in orders:
+            required = int(price) - reserved.get((item.class_id, item.instance_id), 0)
+            if required > available:
+                tasks.append(None)
+                continue
+            available -= required
+            tasks.append(asyncio.ensure_future(self._submit_order(item, price, url_factory(item, price), priority)))
+        results = []
+        try:
+            for (item, price), task in zip(orders, tasks):
+                if task is None:
+                    results.append(OrderResult(item, price, False, InsufficientFundsException()))
+                    continue
+                try:
+                    results.append(OrderResult(item, price, await task))
+                except Exception as e:
+                    results.append(OrderResult(item, price, False, e))
+        except BaseException:
+            for task in tasks:
+                if task is not None:
+                    task.cancel()
+            raise
+        return results
+
+    async def _submit_order(self, item: Item, price: float, url: str, priority: Priority = Priority.TRADE) -> bool:
+        """
+        Отправляет изменение ордера, заранее резервируя под него средства в BalanceLedger.
+
+        Если запрос не удался, резерв возвращается к прежнему значению, а после отказа
+        или ошибки сервера баланс помечается для сверки с GetMoney.
+        """
+        key = (item.class_id, item.instance_id)
+        previous = self.ledger.reserve(key, int(price))
+        self._invalidate_cache(item)
+        try:
+            success = (await self.request_with_boolean_response(url, priority, ()))[0]
+        except BaseException as e:
+            self.ledger.rollback(key, previous)
+            if isinstance(e, (ShutdownError, CancelledError)):
+                if self.closing:
+                    self._aborted_orders.append((item, int(price)))
+            elif isinstance(e, Error):
+                # отказ сервера (например, недостаточно средств) означает, что локальный учет разошелся
+                self.ledger.mark_drift()
+            raise
+        if success:
+            self.ledger.commit(key)
+        else:
+            self.ledger.rollback(key, previous)
+            self.ledger.mark_drift()
+        return success
+
+    def _invalidate_cache(self, item: Item) -> None:
+        """Сбрасывает кэш предмета, наш ордер меняет его список запросов на покупку."""
+        if self.cache is not None:
+            self.cache.invalidate(f'{item.class_id}_{item.instance_id}')
 
     async def delete_order(self, item: Item) -> bool:
         """
@@ -321,7 +627,9 @@ class CSGOMarketAPI:
         url = f'https://market.csgo.com/api/GetOrders/?key={self.API_KEY}'
         result, data = await self.request_with_boolean_response(url)
         if type(data['Orders']) != str:
+            self.ledger.load_orders(data['Orders'])
             return data['Orders']
+        self.ledger.load_orders([])
 
         return dict()
 
@@ -333,19 +641,81 @@ class CSGOMarketAPI:
         """
         logging.debug('PING PONG')
         url = f'https://market.csgo.com/api/PingPong/?key={self.API_KEY}'
-        return (await self.request_with_boolean_response(url))[0]
+        return (await self.request_with_boolean_response(url, Priority.CRITICAL, ()))[0]
 
     def sync_go_offline(self) -> bool:
         """
         Синхронно моментально приостановить торги.
 
+        Вызывается, когда event loop уже остановлен, и слоты запросов, которые были в пути,
+        никто не освободит. Поэтому свободный слот ожидается не дольше одного окна лимитера,
+        затем запрос отправляется без слота.
+
         :return: Результат выполнения.
         """
         logging.debug('Going offline (sync)')
         url = f'https://market.csgo.com/api/GoOffline/?key={self.API_KEY}'
-        response = requests.get(url)
-        data = self.validate_response(response)
-        return data['success']
+        deadline = time.monotonic() + self.limiter.period
+        acquired = self.limiter.acquire_nowait(Priority.CRITICAL)
+        while not acquired and time.monotonic() < deadline:
+            delay = self.limiter.delay(Priority.CRITICAL)
+            time.sleep(min(delay if delay is not None else 0.1, max(0.0, deadline - time.monotonic())))
+            acquired = self.limiter.acquire_nowait(Priority.CRITICAL)
+        try:
+            response = self.sync_transport.get(url)
+        finally:
+            if acquired:
+                self.limiter.release()
+        return self.validate_response(response)['success']
+
+    async def shutdown(self, flush: Priority = Priority.TRADE, timeout: float = 5.0) -> ShutdownReport:
+        """
+        Корректно завершает работу клиента и выходит из онлайна.
+
+        Новые запросы, кроме CRITICAL, больше не принимаются и завершаются ShutdownError.
+        Запросы в очереди лимитера с приоритетом ниже `flush` снимаются сразу. GoOffline
+        отправляется сразу же: очередь перед ним пуста, и он получает первый освободившийся слот.
+        Запросы с приоритетом `flush` и выше (изменения ордеров) успевают завершиться
+        в первой половине `timeout`, потом снимаются и они, а уже отправленные запросы
+        дожидаются ответа. Вся процедура не дольше `timeout`.
+
+        :param flush: least urgent priority which may finish.
+        :param timeout: hard deadline in seconds.
+        :return: ShutdownReport with cancelled requests and aborted order changes.
+        """
+        started = time.monotonic()
+        self.closing = True
+        cancelled = self.limiter.cancel_waiting(Priority(flush + 1), ShutdownError) if flush < Priority.BULK else {}
+        offline = asyncio.ensure_future(self.go_offline())
+        await self._wait_drained(timeout / 2)
+        for priority, count in self.limiter.cancel_waiting(Priority.TRADE, ShutdownError).items():
+            cancelled[priority] = cancelled.get(priority, 0) + count
+        # запросы, уже отправленные на сервер, дожидаются ответа: иначе их отменит остановка задач
+        # уже после отчета, и изменения ордеров пропадут из aborted_orders
+        await self._wait_drained(started + timeout - time.monotonic())
+        try:
+            success = await asyncio.wait_for(offline, max(0.0, started + timeout - time.monotonic()))
+        except (Error, asyncio.TimeoutError) as e:
+            logging.error('Не удалось выйти из онлайна: %s', type(e).__name__)
+            success = False
+        report = ShutdownReport(success, {Priority(p).name: count for p, count in sorted(cancelled.items())},
+                                list(self._aborted_orders), time.monotonic() - started)
+        logging.info('Shutdown in %.2f s: offline=%s, cancelled requests %s, aborted order changes %d',
+                     report.elapsed, report.offline, report.cancelled or 0, len(report.aborted_orders))
+        for item, price in report.aborted_orders:
+            logging.warning('Изменение ордера не отправлено: "%s" %s ₽', item.market_name, price / 100)
+        return report
+
+    async def _wait_drained(self, timeout: float) -> None:
+        """Ожидает завершения всех отправляемых запросов, но не дольше `timeout` секунд."""
+        if not self._sending or timeout <= 0:
+            return
+        if self._drained is None or self._drained.done():
+            self._drained = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(shield(self._drained), timeout)
+        except asyncio.TimeoutError:
+            pass
 
     async def go_offline(self) -> bool:
         """
@@ -355,35 +725,56 @@ class CSGOMarketAPI:
         """
         logging.debug('Going offline')
         url = f'https://market.csgo.com/api/GoOffline/?key={self.API_KEY}'
-        return (await self.request_with_boolean_response(url))[0]
+        return (await self.request_with_boolean_response(url, Priority.CRITICAL, ()))[0]
+
+    async def request_with_boolean_response(self, url: str, priority: Priority = Priority.DEFAULT,
+                                            fields: Sequence[str] = None) -> Tuple[bool, dict]:
+        """
+        Метод для получения и обработки ответа с полем 'success'.
 
-    @request_possibility_check
-    async def request_with_boolean_response(self, url: str) -> Tuple[bool, dict]:
-        """Метод для получения и обработки ответа с полем 'success'."""
-        response = requests.get(url)
-        data = self.validate_response(response)
+        :param fields: decode only these fields besides 'success', by default whole response.
+        """
+        if fields is not None:
+            fields = ('success', *fields)
+        response, data = await self._request(url, priority=priority, fields=fields)
         if 'success' in data:
             return data['success'], data
 
         return False, data
 
     @staticmethod
-    def validate_response(response: requests.Response) -> dict:
+    def validate_response(response: Response, fields: Sequence[str] = None) -> dict:
         """
         Проверяет ответ на наличие ошибок.
 
         :param response: Received response.
+        :param fields: decode only these top level fields (and 'error'), by default whole response.
         :raises BadAPIKey: Bad api key used.
         :return: JSON like dict from response.
         """
+        CSGOMarketAPI._check_status(response)
+        body = response.json() if fields is None else response.json_fields(('error', *fields))
+        CSGOMarketAPI._check_body(body)
+        return body
+
+    async def _validate_offloaded(self, response: Response, fields: Sequence[str] = None) -> dict:
+        """То же, что :meth:`validate_response`, но тело ответа декодируется в executor."""
+        self._check_status(response)
+        body = await asyncio.get_running_loop().run_in_executor(
+            self.executor, decode, response.content, None if fields is None else ('error', *fields))
+        self._check_body(body)
+        return body
+
+    @staticmethod
+    def _check_status(response: Response) -> None:
         if response.status_code == 502:
             raise BadGatewayError()
-        if response.status_code != 200 and 'application/json' not in response.headers['content-type']:
+        if response.status_code != 200 and 'application/json' not in response.headers.get('content-type', ''):
             raise WrongResponseException(response)
-        body = response.json()
+
+    @staticmethod
+    def _check_body(body: dict) -> None:
         if 'error' in body:
             if body['error'] == 'Bad KEY':
                 raise BadAPIKeyException()
             raise UnknownError(body['error'])
-
-        return body
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+__all__ = ['ResponseCache']
+
+
+class ResponseCache:
+    """
+    TTL кэш ответов с LRU вытеснением и объединением одновременных запросов.
+
+    Пока запрос по ключу выполняется, остальные вызовы с тем же ключом ждут его результат
+    и не занимают слоты лимитера. Закэшированные значения общие для всех вызывающих,
+    изменять их нельзя. Пустые значения (неуспешный ответ, например ``dict()``) отдаются
+    ожидающим вызовам, но не кэшируются, чтобы следующий вызов повторил запрос.
+    """
+    DEFAULT_TTLS = {
+        'ItemInfo': 5.0,
+        'SellOffers': 1.0,
+        'BestSellOffer': 1.0,
+        'BuyOffers': 1.0,
+        'BestBuyOffer': 1.0,
+        'ItemHistory': 30.0,
+    }
+
+    def __init__(self, maxsize: int = 1024, ttls: Optional[Dict[str, float]] = None) -> None:
+        """
+        :param maxsize: max cached entries.
+        :param ttls: TTL in seconds by endpoint name, merged with DEFAULT_TTLS. 0 disables caching of endpoint.
+        """
+        self.maxsize = maxsize
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._data = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get_or_fetch(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Возвращает значение из кэша или получает его через `fetch`.
+
+        :param endpoint: API method name, selects TTL.
+        :param key: item key like 'classid_instanceid', variants of one item are separated by '/'.
+        :param fetch: coroutine function making the real request.
+        :return: cached or fresh value.
+        """
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return await fetch()
+        full_key = (endpoint, key)
+        entry = self._data.get(full_key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._data.move_to_end(full_key)
+                self.hits += 1
+                return entry[1]
+            del self._data[full_key]
+        task = self._inflight.get(full_key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(full_key, ttl, fetch))
+            self._inflight[full_key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _fetch(self, full_key: tuple, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        finally:
+            self._inflight.pop(full_key, None)
+        if not value:
+            return value
+        self._data[full_key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(full_key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Удаляет записи из кэша.
+
+        :param key: item key, if not passed cache is cleared completely.
+        """
+        if key is None:
+            self._data.clear()
+            return
+        prefix = key + '/'
+        for full_key in [k for k in self._data if k[1] == key or k[1].startswith(prefix)]:
+            del self._data[full_key]
+
+    def stats(self) -> dict:
+        """
+        Статистика кэша.
+
+        `saved` — количество запросов, которые не ушли в сеть.
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'size': len(self._data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'saved': self.hits + self.coalesced,
+            'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
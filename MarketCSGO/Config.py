@@ -0,0 +1,142 @@
+import logging
+import os
+import runpy
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .OrderBook import *
+
+__all__ = ['ConfigDiff', 'ConfigWatcher']
+
+ItemKey = Tuple[int, int]
+
+
+class ConfigDiff(NamedTuple):
+    """Изменения списка закупки и интервала сверки после перечитывания конфига."""
+    added: Dict[ItemKey, int]
+    removed: List[ItemKey]
+    repriced: Dict[ItemKey, int]
+    delay: Optional[float] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.repriced or self.delay is not None)
+
+
+class ConfigWatcher:
+    """
+    Перечитывает config.py на ходу и переносит изменения ITEMS_PURCHASE в OrderBook.
+
+    Файл перечитывается, только если изменились его mtime или размер. Новый список
+    сравнивается с уже примененным, и через mass_info запрашиваются только добавленные
+    предметы. Желаемое состояние OrderBook подменяется целиком, когда все новые предметы
+    получены, поэтому идущие запросы и сверка не прерываются. Если файл не удалось прочитать,
+    выполнить или запросить предметы, остается прежнее состояние, а попытка повторится
+    при следующем вызове :meth:`reload`.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: config file with ITEMS_PURCHASE and MAIN_LOOP_DELAY.
+        """
+        self.path = path
+        self.items: Dict[ItemKey, int] = {}
+        self.delay: Optional[float] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self.reloads = 0
+        self.failures = 0
+
+    def _changed(self) -> bool:
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+    def load(self) -> Tuple[Dict[ItemKey, int], float]:
+        """
+        Выполняет файл конфига и читает из него список закупки.
+
+        :return: ({(class_id, instance_id): price}, MAIN_LOOP_DELAY in seconds)
+        """
+        config = runpy.run_path(self.path)
+        items = {}
+        for item in config['ITEMS_PURCHASE']:
+            items[(int(item['class_id']), int(item['instance_id']))] = int(item['price'])
+        return items, config['MAIN_LOOP_DELAY'] / 1000
+
+    @staticmethod
+    def diff(old: Dict[ItemKey, int], new: Dict[ItemKey, int]) -> ConfigDiff:
+        """
+        Минимальные изменения списка закупки.
+
+        :param old: applied {(class_id, instance_id): price}.
+        :param new: {(class_id, instance_id): price} from config.
+        :return: ConfigDiff without delay.
+        """
+        added = {key: price for key, price in new.items() if key not in old}
+        removed = [key for key in old if key not in new]
+        repriced = {key: price for key, price in new.items() if key in old and old[key] != price}
+        return ConfigDiff(added, removed, repriced)
+
+    async def reload(self, bot, book: OrderBook, force: bool = False) -> ConfigDiff:
+        """
+        Перечитывает конфиг, если он изменился, и применяет изменения к `book`.
+
+        Удаленные из списка предметы убираются из желаемого состояния, их ордера удалит
+        следующая сверка. Предметы, которых нет в ответе MassInfo, не добавляются.
+
+        :param bot: CSGOMarketAPI used to resolve added items.
+        :param book: OrderBook of the running loop.
+        :param force: read config even if file has not changed, errors of reading are raised.
+        :return: applied ConfigDiff, empty if nothing has changed.
+        """
+        try:
+            if not self._changed() and not force:
+                return ConfigDiff({}, [], {})
+            items, delay = self.load()
+        except Exception as e:
+            self.failures += 1
+            if force:
+                raise
+            logging.error('Config %s is not loaded: %r', self.path, e)
+            return ConfigDiff({}, [], {})
+        diff = self.diff(self.items, items)
+        resolved = {}
+        if diff.added:
+            try:
+                found = await bot.mass_info([{'class_id': key[0], 'instance_id': key[1]} for key in diff.added])
+            except Exception:
+                self.failures += 1
+                self._stamp = None
+                raise
+            resolved = {(item.class_id, item.instance_id): item for item in found}
+            for key in diff.added:
+                if key not in resolved:
+                    logging.warning('Item %s_%s from config is not found on market', *key)
+            diff = diff._replace(added={key: price for key, price in diff.added.items() if key in resolved})
+        desired = dict(book.desired)
+        for key in diff.removed:
+            desired.pop(key, None)
+        for key, price in diff.repriced.items():
+            if key in desired:
+                desired[key] = (desired[key][0], price)
+        for key, price in diff.added.items():
+            desired[key] = (resolved[key], price)
+        book.replace(desired)
+        applied = dict(self.items)
+        for key in diff.removed:
+            del applied[key]
+        applied.update(diff.repriced)
+        applied.update(diff.added)
+        self.items = applied
+        if delay != self.delay:
+            diff = diff._replace(delay=delay)
+            self.delay = delay
+        self.reloads += 1
+        if diff:
+            logging.info('Config reloaded: +%d -%d ~%d items%s', len(diff.added), len(diff.removed),
+                         len(diff.repriced), f', delay {delay} s' if diff.delay is not None else '')
+        return diff
+
+    def stats(self) -> dict:
+        return {'items': len(self.items), 'reloads': self.reloads, 'failures': self.failures}
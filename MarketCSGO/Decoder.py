@@ -0,0 +1,109 @@
+import importlib
+import json
+import threading
+from typing import Any, Iterable, Optional
+
+__all__ = ['json_backend', 'loads', 'loads_fields', 'decode']
+
+# на коротких ответах полный разбор быстрее, чем подготовка ленивого документа
+LAZY_THRESHOLD = 16 * 1024
+
+orjson = None
+simdjson = None
+_backend: Optional[str] = None
+# simdjson.Parser нельзя использовать из нескольких потоков, у каждого потока свой
+_local = threading.local()
+
+
+def _optional(name: str):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def json_backend() -> str:
+    """
+    Выбирает декодер: orjson, simdjson или json.
+
+    Необязательные модули импортируются при первом разборе ответа, а не при импорте пакета.
+
+    :return: backend name.
+    """
+    global orjson, simdjson, _backend
+    if _backend is None:
+        orjson = _optional('orjson')
+        simdjson = _optional('simdjson')
+        _backend = 'orjson' if orjson is not None else 'simdjson' if simdjson is not None else 'json'
+    return _backend
+
+
+def loads(content: bytes) -> Any:
+    """
+    Декодирует JSON самым быстрым из установленных декодеров: orjson, simdjson или json.
+
+    :param content: raw response body.
+    """
+    if _backend is None:
+        json_backend()
+    if orjson is not None:
+        return orjson.loads(content)
+    if simdjson is not None:
+        return simdjson.loads(content)
+    return json.loads(content)
+
+
+def _materialize(value) -> Any:
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def loads_fields(content: bytes, fields: Iterable[str]) -> dict:
+    """
+    Декодирует только указанные поля верхнего уровня JSON объекта.
+
+    С simdjson документ длиннее LAZY_THRESHOLD разбирается лениво, и в объекты Python
+    превращаются только нужные поля. Иначе декодируется весь документ.
+
+    :param content: raw response body.
+    :param fields: top level keys.
+    :return: dict with found fields, or decoded document if it is not an object.
+    """
+    if _backend is None:
+        json_backend()
+    if simdjson is None or len(content) < LAZY_THRESHOLD:
+        document = loads(content)
+        if not isinstance(document, dict):
+            return document
+        return {field: document[field] for field in fields if field in document}
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = simdjson.Parser()
+    try:
+        document = parser.parse(content)
+    except RuntimeError:
+        # парсер еще занят документом, на который осталась ссылка
+        parser = _local.parser = simdjson.Parser()
+        document = parser.parse(content)
+    try:
+        if not isinstance(document, simdjson.Object):
+            return _materialize(document)
+        return {field: _materialize(document[field]) for field in fields if field in document}
+    finally:
+        del document
+
+
+def decode(content: bytes, fields: Optional[Iterable[str]] = None) -> Any:
+    """
+    Декодирует тело ответа целиком или только указанные поля.
+
+    Функция модульного уровня, поэтому ее можно передать в ProcessPoolExecutor:
+    в процесс уходят байты ответа, обратно возвращаются только выбранные поля.
+
+    :param content: raw response body.
+    :param fields: top level keys, by default whole document.
+    """
+    return loads(content) if fields is None else loads_fields(content, fields)
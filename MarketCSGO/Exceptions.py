@@ -1,9 +1,11 @@
 import logging
+from typing import TYPE_CHECKING
 
-import requests
+if TYPE_CHECKING:
+    from .Transport import Response
 
 __all__ = ['Error', 'BadGatewayError', 'WrongResponseException', 'BadAPIKeyException', 'InsufficientFundsException',
-           'UnknownError']
+           'UnknownError', 'NetworkError', 'ShutdownError']
 
 
 class Error(Exception):
@@ -21,7 +23,7 @@ class BadAPIKeyException(Error):
 class WrongResponseException(Error):
     """Получен некорректный ответ от сервера."""
 
-    def __init__(self, response: requests.Response):
+    def __init__(self, response: 'Response'):
         """
         :param response: Received response.
         """
@@ -59,3 +61,19 @@ class BadGatewayError(Error):
         else:
             logging.error(text)
         self.response = text
+
+
+class NetworkError(Error):
+    """Ошибка соединения или таймаут запроса."""
+
+    def __init__(self, text: str = ''):
+        """
+        :param text: Error text
+        """
+        logging.error(f'Network error: {text}')
+        self.response = text
+
+
+class ShutdownError(Error):
+    """Клиент завершает работу, запрос не был отправлен."""
+    pass
@@ -1,9 +1,28 @@
+from typing import List, Optional
+
 __all__ = ['Item']
 
+_EMPTY = {}
+
+
+def _instance_id_or_none(value) -> Optional[int]:
+    return value if value is not None and value != 'null' else None
+
 
 class Item:
+    """
+    Предмет торговой площадки.
+
+    Равенство и хэш определяются парой (class_id, instance_id), поэтому предметы
+    можно использовать как ключи словарей и элементы множеств.
+    """
+
+    __slots__ = ('class_id', 'instance_id', 'market_name', 'market_hash_name', 'hash', 'description', 'tags',
+                 'our_market_instance_id', 'sell_offers', 'buy_offers', 'history')
+
     def __init__(self, class_id: int, instance_id: int, market_name: str, market_hash_name: str, hash: str,
-                 description: list = None, tags: list = None, our_market_instance_id: int = None):
+                 description: list = None, tags: list = None, our_market_instance_id: int = None,
+                 sell_offers: dict = None, buy_offers: dict = None, history: dict = None):
         self.class_id = class_id
         self.instance_id = instance_id
         self.market_name = market_name
@@ -12,35 +31,59 @@ class Item:
         self.description = description
         self.tags = tags
         self.our_market_instance_id = our_market_instance_id
+        self.sell_offers = sell_offers
+        self.buy_offers = buy_offers
+        self.history = history
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Item):
+            return self.class_id == other.class_id and self.instance_id == other.instance_id
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.class_id, self.instance_id))
+
+    def __repr__(self) -> str:
+        return f'Item({self.class_id}_{self.instance_id}, {self.market_hash_name!r})'
+
+    @property
+    def best_sell_price(self) -> Optional[int]:
+        """Цена самого дешевого предложения о продаже в копейках, если она была запрошена."""
+        if isinstance(self.sell_offers, dict) and self.sell_offers.get('best_offer'):
+            return int(self.sell_offers['best_offer'])
+        return None
+
+    @property
+    def best_buy_price(self) -> Optional[int]:
+        """Цена самого дорогого запроса на покупку в копейках, если она была запрошена."""
+        if isinstance(self.buy_offers, dict) and self.buy_offers.get('best_offer'):
+            return int(self.buy_offers['best_offer'])
+        return None
 
     @staticmethod
     def new_from_response_item_info(response: dict):
-        item_data = {
-            'class_id': int(response['classid']),
-            'instance_id': int(response['instanceid']),
-            'market_name': response['market_name'],
-            'market_hash_name': response['market_hash_name'],
-            'description': response['description'],
-            'tags': response['tags'],
-            'our_market_instance_id':
-                response['our_market_instanceid'] if
-                response['our_market_instanceid'] != 'null' else None,
-            'hash': response['hash']
-        }
-
-        return Item(**item_data)
+        return Item(int(response['classid']), int(response['instanceid']),
+                    response['market_name'], response['market_hash_name'], response['hash'],
+                    response['description'], response['tags'],
+                    _instance_id_or_none(response['our_market_instanceid']),
+                    response.get('offers'), response.get('buy_offers'))
 
     @staticmethod
     def new_from_mass_info(response: dict):
-        item_data = {
-            'class_id': int(response['classid']),
-            'instance_id': int(response['instanceid']),
-            'market_name': response['info']['market_name'],
-            'market_hash_name': response['info']['market_hash_name'],
-            'our_market_instance_id':
-                response['info']['our_market_instanceid'] if
-                response['info']['our_market_instanceid'] != 'null' else None,
-            'hash': response['info']['hash']
-        }
-
-        return Item(**item_data)
+        info = response.get('info', _EMPTY)
+        return Item(int(response['classid']), int(response['instanceid']),
+                    info.get('market_name'), info.get('market_hash_name'), info.get('hash'),
+                    info.get('description'), info.get('tags'),
+                    _instance_id_or_none(info.get('our_market_instanceid')),
+                    response.get('sell_offers'), response.get('buy_offers'), response.get('history'))
+
+    @staticmethod
+    def new_from_mass_info_results(results: List[dict]) -> List['Item']:
+        """
+        Создает предметы из списка `results` ответа MassInfo.
+
+        :param results: raw MassInfo results.
+        :return: list of items in the same order.
+        """
+        new = Item.new_from_mass_info
+        return [new(i) for i in results]
@@ -0,0 +1,183 @@
+import asyncio
+import csv
+import logging
+import os
+import sqlite3
+from typing import Iterator, List, NamedTuple, Optional
+
+from .Exceptions import *
+
+__all__ = ['ItemDB', 'ItemDBRecord']
+
+
+class ItemDBRecord(NamedTuple):
+    """Запись из базы предметов current_730."""
+    class_id: int
+    instance_id: int
+    market_name: str
+    market_hash_name: str
+    price: Optional[int]
+    offers: Optional[int]
+    popularity: Optional[int]
+
+
+def _to_int(value: str) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+class ItemDB:
+    """
+    Локальная копия базы всех предметов из get_itemdb_uri с индексом в SQLite.
+
+    База скачивается потоком на диск и разбирается построчно, тело ответа целиком
+    в памяти не держится. Индекс строится в отдельный файл и подменяет старый
+    атомарно, поэтому чтение не прерывается во время обновления.
+    """
+    INDEX_NAME = 'itemdb.sqlite3'
+    RAW_NAME = 'current_730.csv'
+
+    def __init__(self, directory: str) -> None:
+        """
+        :param directory: directory for downloaded DB and index.
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.index_path)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        return self._connection
+
+    @property
+    def time(self) -> Optional[str]:
+        """Метка времени текущей загруженной базы или None."""
+        if not os.path.exists(self.index_path):
+            return None
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'time'").fetchone()
+        return row[0] if row else None
+
+    async def update(self, api, force: bool = False) -> bool:
+        """
+        Обновляет локальную базу, если на сервере появилась новая версия.
+
+        :param api: CSGOMarketAPI, used for get_itemdb_uri and its transport.
+        :param force: download even if `time` has not changed.
+        :return: True if DB was downloaded and index rebuilt.
+        """
+        uri, db_time = await api.get_itemdb_uri()
+        if not force and db_time == self.time:
+            logging.debug('ItemDB is up to date (%s)', db_time)
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        raw_path = os.path.join(self.directory, self.RAW_NAME)
+        response = await api.transport.download(uri, raw_path)
+        if response.status_code != 200:
+            raise WrongResponseException(response)
+        # индекс строится в executor клиента (в нем может быть и пул процессов), иначе в пуле потоков
+        tmp_path = await asyncio.get_running_loop().run_in_executor(
+            getattr(api, 'executor', None), self._write_index, self.index_path, raw_path, db_time)
+        self._replace_index(tmp_path)
+        logging.info('ItemDB updated to %s', db_time)
+        return True
+
+    def build_index(self, raw_path: str, db_time: str) -> None:
+        """
+        Строит SQLite индекс по скачанному CSV файлу базы.
+
+        :param raw_path: path to downloaded DB.
+        :param db_time: DB version from get_itemdb_uri.
+        """
+        self._replace_index(self._write_index(self.index_path, raw_path, db_time))
+
+    @staticmethod
+    def _write_index(index_path: str, raw_path: str, db_time: str) -> str:
+        tmp_path = index_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.executescript('''
+                PRAGMA journal_mode = OFF;
+                PRAGMA synchronous = OFF;
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE items (
+                    class_id INTEGER NOT NULL,
+                    instance_id INTEGER NOT NULL,
+                    market_name TEXT,
+                    market_hash_name TEXT,
+                    price INTEGER,
+                    offers INTEGER,
+                    popularity INTEGER,
+                    PRIMARY KEY (class_id, instance_id)
+                ) WITHOUT ROWID;
+            ''')
+            with open(raw_path, newline='', encoding='utf-8') as file:
+                connection.executemany('INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                       ItemDB._parse_rows(file))
+            connection.execute('CREATE INDEX items_market_hash_name ON items (market_hash_name)')
+            connection.execute("INSERT INTO meta VALUES ('time', ?)", (db_time,))
+            connection.commit()
+        finally:
+            connection.close()
+        return tmp_path
+
+    def _replace_index(self, tmp_path: str) -> None:
+        self.close()
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _parse_rows(file) -> Iterator[tuple]:
+        reader = csv.reader(file, delimiter=';')
+        header = next(reader, None)
+        if header is None or 'c_classid' not in header:
+            raise UnknownError(f'Unexpected item DB header: {header}')
+        column = {name: index for index, name in enumerate(header)}
+        class_id, instance_id = column['c_classid'], column['c_instanceid']
+        market_name = column.get('c_market_name')
+        hash_name = column.get('c_market_hash_name', column.get('c_market_name_en'))
+        price, offers, popularity = column.get('c_price'), column.get('c_offers'), column.get('c_popularity')
+        for row in reader:
+            if len(row) != len(header):
+                continue
+            yield (int(row[class_id]), int(row[instance_id]),
+                   row[market_name] if market_name is not None else None,
+                   row[hash_name] if hash_name is not None else None,
+                   _to_int(row[price]) if price is not None else None,
+                   _to_int(row[offers]) if offers is not None else None,
+                   _to_int(row[popularity]) if popularity is not None else None)
+
+    def get(self, class_id: int, instance_id: int) -> Optional[ItemDBRecord]:
+        """
+        Ищет предмет по class_id и instance_id.
+
+        :return: ItemDBRecord or None.
+        """
+        if not os.path.exists(self.index_path):
+            return None
+        row = self.connection.execute('SELECT * FROM items WHERE class_id = ? AND instance_id = ?',
+                                      (class_id, instance_id)).fetchone()
+        return ItemDBRecord(*row) if row else None
+
+    def find_by_hash_name(self, market_hash_name: str) -> List[ItemDBRecord]:
+        """
+        Ищет все class_id/instance_id предмета по market_hash_name.
+
+        :return: list of ItemDBRecord.
+        """
+        if not os.path.exists(self.index_path):
+            return []
+        rows = self.connection.execute('SELECT * FROM items WHERE market_hash_name = ?', (market_hash_name,))
+        return [ItemDBRecord(*row) for row in rows]
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
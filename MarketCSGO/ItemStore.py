@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional
+
+__all__ = ['ItemStore']
+
+ItemKey = str
+
+
+class ItemStore:
+    """
+    Постоянный кэш метаданных предметов (название, hash, описание) на диске.
+
+    Метаданные предмета не меняются, пока не обновится база предметов, поэтому записи
+    хранятся между перезапусками и сбрасываются, когда меняется метка времени из
+    get_itemdb_uri. Хранится блок ``info`` ответа MassInfo вместе с уровнем детализации,
+    запрос с уровнем не выше сохраненного обслуживается без обращения к API.
+    """
+    SCHEMA_VERSION = '1'
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: SQLite file.
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        ''')
+        if self._meta('schema') != self.SCHEMA_VERSION:
+            self._create()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.connection.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
+
+    def _create(self) -> None:
+        with self.connection:
+            self.connection.execute('DROP TABLE IF EXISTS items')
+            self.connection.execute('''
+                CREATE TABLE items (
+                    key TEXT PRIMARY KEY,
+                    level INTEGER NOT NULL,
+                    info TEXT NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            self.connection.execute('DELETE FROM meta')
+            self._set_meta('schema', self.SCHEMA_VERSION)
+
+    @property
+    def db_time(self) -> Optional[str]:
+        """Метка времени базы предметов, для которой действительны записи."""
+        return self._meta('itemdb_time')
+
+    def validate(self, db_time: str) -> bool:
+        """
+        Сбрасывает записи, если база предметов обновилась.
+
+        :param db_time: time from CSGOMarketAPI.get_itemdb_uri().
+        :return: True if records were dropped.
+        """
+        if db_time == self.db_time:
+            return False
+        with self.connection:
+            dropped = self.connection.execute('DELETE FROM items').rowcount
+            self._set_meta('itemdb_time', db_time)
+        if dropped:
+            logging.info('Item metadata cache invalidated by item DB %s (%d records)', db_time, dropped)
+        return bool(dropped)
+
+    async def refresh(self, api) -> bool:
+        """
+        Проверяет актуальность записей по get_itemdb_uri.
+
+        :param api: CSGOMarketAPI.
+        :return: True if records were dropped.
+        """
+        _, db_time = await api.get_itemdb_uri()
+        return self.validate(db_time)
+
+    def get_many(self, keys: Iterable[ItemKey], level: int) -> Dict[ItemKey, dict]:
+        """
+        Ищет метаданные предметов.
+
+        :param keys: keys like 'classid_instanceid'.
+        :param level: required `info` level of MassInfo.
+        :return: {key: info} for found records with at least `level` detail.
+        """
+        keys = list(keys)
+        result = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.connection.execute(
+                f'SELECT key, info FROM items WHERE level >= ? AND key IN ({",".join("?" * len(chunk))})',
+                (level, *chunk))
+            result.update((key, json.loads(info)) for key, info in rows)
+        self.hits += len(result)
+        self.misses += len(keys) - len(result)
+        return result
+
+    def put_many(self, infos: Dict[ItemKey, dict], level: int) -> None:
+        """
+        Сохраняет метаданные, не понижая уровень уже сохраненных записей.
+
+        :param infos: {key: info block of MassInfo result}.
+        :param level: `info` level of these records.
+        """
+        if not infos:
+            return
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO items VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE '
+                'SET level = excluded.level, info = excluded.info WHERE excluded.level >= items.level',
+                ((key, level, json.dumps(info, ensure_ascii=False)) for key, info in infos.items()))
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,123 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from .Exceptions import *
+
+__all__ = ['BalanceLedger']
+
+OrderKey = Tuple[int, int]
+
+
+class BalanceLedger:
+    """
+    Локальный учет баланса аккаунта.
+
+    Подтвержденный баланс приходит из GetMoney, а под каждый ордер на покупку резервируется
+    его цена, поэтому доступные средства известны без запроса перед каждым ордером.
+    Все операции синхронные и не прерываются другими задачами event loop, так что
+    проверка и резервирование атомарны при одновременном выставлении ордеров.
+    """
+
+    def __init__(self, sync_interval: float = 300.0) -> None:
+        """
+        :param sync_interval: max time between GetMoney reconciliations in seconds.
+        """
+        self.sync_interval = sync_interval
+        self.balance = -1
+        self.reserved: Dict[OrderKey, int] = {}
+        self.reserved_total = 0
+        self.synced_at: Optional[float] = None
+        self.drift = False
+        self._pending: Dict[OrderKey, int] = {}
+
+    @property
+    def available(self) -> int:
+        """Средства, не зарезервированные под ордера, в копейках."""
+        return self.balance - self.reserved_total
+
+    @property
+    def needs_sync(self) -> bool:
+        """Нужно ли сверить баланс с GetMoney."""
+        return (self.synced_at is None or self.drift
+                or time.monotonic() - self.synced_at > self.sync_interval)
+
+    def sync(self, money: int) -> int:
+        """
+        Принимает баланс из GetMoney.
+
+        :param money: balance in kopecks.
+        :return: difference with previous confirmed balance.
+        """
+        difference = money - self.balance if self.balance >= 0 else 0
+        if difference:
+            logging.debug('Balance changed by %s since last sync', difference)
+        self.balance = money
+        self.synced_at = time.monotonic()
+        self.drift = False
+        return difference
+
+    def load_orders(self, orders: Iterable[dict]) -> None:
+        """
+        Пересчитывает резервы по ответу GetOrders.
+
+        Резервы ордеров, которые сейчас отправляются, сохраняются.
+
+        :param orders: orders from CSGOMarketAPI.get_orders().
+        """
+        reserved = {(int(order['i_classid']), int(order['i_instanceid'])): int(float(order['o_price']))
+                    for order in orders}
+        for key in self._pending:
+            if key in self.reserved:
+                reserved[key] = self.reserved[key]
+            else:
+                reserved.pop(key, None)
+        self.reserved = reserved
+        self.reserved_total = sum(reserved.values())
+
+    def reserve(self, key: OrderKey, price: int) -> int:
+        """
+        Резервирует средства под ордер, заменяя прошлый резерв этого предмета.
+
+        :param key: (class_id, instance_id).
+        :param price: order price in kopecks.
+        :raises InsufficientFundsException: not enough available funds.
+        :return: previous reservation for rollback via :meth:`rollback`.
+        """
+        previous = self.reserved.get(key, 0)
+        if price - previous > self.available:
+            raise InsufficientFundsException()
+        self._set(key, price)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        return previous
+
+    def commit(self, key: OrderKey) -> None:
+        """Подтверждает резерв после успешного запроса."""
+        self._done(key)
+
+    def rollback(self, key: OrderKey, previous: int) -> None:
+        """Возвращает резерв к значению до :meth:`reserve` после неудачного запроса."""
+        self._set(key, previous)
+        self._done(key)
+
+    def release(self, key: OrderKey) -> None:
+        """Снимает резерв удаленного ордера."""
+        self._set(key, 0)
+
+    def mark_drift(self) -> None:
+        """Помечает баланс как требующий сверки, например после отказа сервера."""
+        self.drift = True
+
+    def _set(self, key: OrderKey, price: int) -> None:
+        self.reserved_total += price - self.reserved.get(key, 0)
+        if price:
+            self.reserved[key] = price
+        else:
+            self.reserved.pop(key, None)
+
+    def _done(self, key: OrderKey) -> None:
+        count = self._pending.get(key, 0) - 1
+        if count > 0:
+            self._pending[key] = count
+        else:
+            self._pending.pop(key, None)
@@ -0,0 +1,277 @@
+import logging
+import os
+import random
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+__all__ = ['Histogram', 'EndpointMetrics', 'Metrics', 'RequestHook', 'SlowRequestHook',
+           'BaseExporter', 'PrometheusExporter', 'LogExporter']
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин, как histogram в Prometheus."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """
+        :param bounds: sorted upper bounds of buckets, the last +Inf bucket is implicit.
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Оценка квантиля по верхней границе корзины.
+
+        :param q: quantile in range [0, 1].
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class EndpointMetrics:
+    """Счетчики одного метода API."""
+
+    __slots__ = ('requests', 'errors', 'latency', 'wait', 'response_bytes', 'decode_time')
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors: Counter = Counter()
+        self.latency = Histogram()
+        self.wait = Histogram()
+        self.response_bytes = 0
+        self.decode_time = 0.0
+
+
+class RequestHook:
+    """
+    Хук вокруг отдельных запросов, например для профилирования.
+
+    Вызывается только для доли запросов, заданной в :meth:`Metrics.add_hook`.
+    """
+
+    def before(self, endpoint: str) -> None:
+        pass
+
+    def after(self, endpoint: str, elapsed: float, error: Optional[Exception]) -> None:
+        pass
+
+
+class SlowRequestHook(RequestHook):
+    """Логирует запросы, которые выполнялись дольше порога."""
+
+    def __init__(self, threshold: float = 1.0) -> None:
+        """
+        :param threshold: request duration in seconds including limiter wait.
+        """
+        self.threshold = threshold
+
+    def after(self, endpoint: str, elapsed: float, error: Optional[Exception]) -> None:
+        if elapsed >= self.threshold:
+            logging.warning('Slow request %s: %.3f s%s', endpoint, elapsed,
+                            f' ({type(error).__name__})' if error is not None else '')
+
+
+class Metrics:
+    """
+    Метрики клиента: запросы, задержки, ожидание в лимитере, размер ответов,
+    время разбора JSON и ошибки по методам API.
+
+    Запись — несколько сложений и один bisect на запрос, поэтому метрики включены всегда.
+    Статистика лимитера и кэша подключается как источники и читается только при экспорте.
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.sources: Dict[str, Callable[[], dict]] = {}
+        self.exporters: List['BaseExporter'] = []
+        self.hooks: List[Tuple[RequestHook, float]] = []
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def observe(self, endpoint: str, wait: float, latency: float, size: int, decode_time: float) -> None:
+        """
+        Записывает успешно полученный ответ.
+
+        :param endpoint: API method name.
+        :param wait: time in limiter queue in seconds.
+        :param latency: transport time in seconds.
+        :param size: response body size in bytes.
+        :param decode_time: JSON decoding and validation time in seconds.
+        """
+        metrics = self.endpoint(endpoint)
+        metrics.requests += 1
+        metrics.wait.observe(wait)
+        metrics.latency.observe(latency)
+        metrics.response_bytes += size
+        metrics.decode_time += decode_time
+
+    def observe_error(self, endpoint: str, error: Exception) -> None:
+        self.endpoint(endpoint).errors[type(error).__name__] += 1
+
+    def add_source(self, name: str, stats: Callable[[], dict]) -> None:
+        """
+        Подключает источник статистики, например ``limiter.stats``.
+
+        :param name: prefix of exported values.
+        :param stats: function returning dict of numbers.
+        """
+        self.sources[name] = stats
+
+    def add_exporter(self, exporter: 'BaseExporter') -> None:
+        self.exporters.append(exporter)
+
+    def add_hook(self, hook: RequestHook, sample_rate: float = 1.0) -> None:
+        """
+        :param hook: RequestHook.
+        :param sample_rate: share of requests passed to hook, from 0 to 1.
+        """
+        self.hooks.append((hook, sample_rate))
+
+    def sample_hooks(self) -> List[RequestHook]:
+        """Хуки, выбранные для очередного запроса."""
+        if not self.hooks:
+            return []
+        return [hook for hook, rate in self.hooks if rate >= 1.0 or random.random() < rate]
+
+    def snapshot(self) -> dict:
+        """
+        Текущие значения метрик.
+
+        :return: {'endpoints': {name: dict}, name of source: dict}
+        """
+        result = {'endpoints': {
+            name: {
+                'requests': m.requests,
+                'errors': dict(m.errors),
+                'latency_avg': m.latency.sum / m.latency.count if m.latency.count else 0.0,
+                'latency_p99': m.latency.quantile(0.99),
+                'wait_avg': m.wait.sum / m.wait.count if m.wait.count else 0.0,
+                'response_bytes': m.response_bytes,
+                'decode_time': m.decode_time,
+            } for name, m in self.endpoints.items()
+        }}
+        for name, stats in self.sources.items():
+            result[name] = stats()
+        return result
+
+    def export(self) -> None:
+        """Передает метрики всем экспортерам, удобно вызывать задачей Scheduler."""
+        for exporter in self.exporters:
+            exporter.export(self)
+
+
+class BaseExporter:
+    """Экспортер метрик."""
+
+    def export(self, metrics: Metrics) -> None:
+        raise NotImplementedError
+
+
+class PrometheusExporter(BaseExporter):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    С указанным путем файл перезаписывается атомарно при каждом экспорте,
+    что подходит для textfile collector у node_exporter.
+    """
+
+    def __init__(self, path: str = None, prefix: str = 'csgo_market', labels: Dict[str, str] = None) -> None:
+        """
+        :param path: file for textfile collector, if None only :meth:`render` is useful.
+        :param prefix: metric name prefix.
+        :param labels: constant labels, e.g. {'account': 'main'}.
+        """
+        self.path = path
+        self.prefix = prefix
+        self.labels = labels or {}
+
+    def _labels(self, **labels) -> str:
+        labels = {**self.labels, **labels}
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+    def _histogram(self, lines: List[str], name: str, endpoint: str, histogram: Histogram) -> None:
+        seen = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            seen += count
+            lines.append(f'{name}_bucket{self._labels(endpoint=endpoint, le=bound)} {seen}')
+        lines.append(f'{name}_bucket{self._labels(endpoint=endpoint, le="+Inf")} {histogram.count}')
+        lines.append(f'{name}_sum{self._labels(endpoint=endpoint)} {histogram.sum}')
+        lines.append(f'{name}_count{self._labels(endpoint=endpoint)} {histogram.count}')
+
+    def render(self, metrics: Metrics) -> str:
+        p = self.prefix
+        endpoints = sorted(metrics.endpoints.items())
+        lines = [f'# TYPE {p}_requests_total counter']
+        lines += [f'{p}_requests_total{self._labels(endpoint=name)} {m.requests}' for name, m in endpoints]
+        lines.append(f'# TYPE {p}_errors_total counter')
+        lines += [f'{p}_errors_total{self._labels(endpoint=name, error=error)} {count}'
+                  for name, m in endpoints for error, count in sorted(m.errors.items())]
+        lines.append(f'# TYPE {p}_response_bytes_total counter')
+        lines += [f'{p}_response_bytes_total{self._labels(endpoint=name)} {m.response_bytes}' for name, m in endpoints]
+        lines.append(f'# TYPE {p}_decode_seconds_total counter')
+        lines += [f'{p}_decode_seconds_total{self._labels(endpoint=name)} {m.decode_time}' for name, m in endpoints]
+        lines.append(f'# TYPE {p}_request_seconds histogram')
+        for name, m in endpoints:
+            self._histogram(lines, f'{p}_request_seconds', name, m.latency)
+        lines.append(f'# TYPE {p}_limiter_wait_seconds histogram')
+        for name, m in endpoints:
+            self._histogram(lines, f'{p}_limiter_wait_seconds', name, m.wait)
+        for source, stats in metrics.sources.items():
+            for key, value in stats().items():
+                if isinstance(value, (int, float)):
+                    lines.append(f'{p}_{source}_{key}{self._labels()} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, metrics: Metrics) -> None:
+        if self.path is None:
+            return
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as file:
+            file.write(self.render(metrics))
+        os.replace(temp, self.path)
+
+
+class LogExporter(BaseExporter):
+    """Периодическая сводка метрик в лог: изменения с прошлого экспорта по каждому методу."""
+
+    def __init__(self, level: int = logging.INFO) -> None:
+        self.level = level
+        self._last: Dict[str, Tuple[int, float, float]] = {}
+
+    def export(self, metrics: Metrics) -> None:
+        for name, m in sorted(metrics.endpoints.items()):
+            requests, latency, wait = self._last.get(name, (0, 0.0, 0.0))
+            count = m.requests - requests
+            if not count:
+                continue
+            logging.log(self.level, '%s: %d req, avg %.1f ms, wait %.1f ms, errors %s', name, count,
+                        (m.latency.sum - latency) / count * 1000, (m.wait.sum - wait) / count * 1000,
+                        dict(m.errors) or 0)
+            self._last[name] = (m.requests, m.latency.sum, m.wait.sum)
+        for source, stats in metrics.sources.items():
+            logging.log(self.level, '%s: %s', source, stats())
@@ -0,0 +1,127 @@
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .Exceptions import *
+from .Item import *
+from .types import *
+
+__all__ = ['OrderBook', 'OrderDiff']
+
+OrderKey = Tuple[int, int]
+
+
+class OrderDiff(NamedTuple):
+    """Набор изменений, необходимых для приведения ордеров к желаемому состоянию."""
+    insert: List[Tuple[Item, int]]
+    update: List[Tuple[Item, int]]
+    delete: List[Item]
+
+    def __bool__(self) -> bool:
+        return bool(self.insert or self.update or self.delete)
+
+
+class OrderBook:
+    """
+    Желаемое состояние ордеров на автопокупку и сверка его с GetOrders.
+
+    Текущие ордера индексируются по (class_id, instance_id) один раз за сверку,
+    поэтому стоимость тика линейна от числа ордеров, а на сервер уходят только
+    необходимые изменения: новые ордера, изменение цены и удаление лишних.
+    """
+
+    def __init__(self, delete_unknown: bool = True) -> None:
+        """
+        :param delete_unknown: delete orders for items which are not in desired state.
+        """
+        self.delete_unknown = delete_unknown
+        self.desired: Dict[OrderKey, Tuple[Item, int]] = {}
+
+    def set(self, item: Item, price: int) -> None:
+        """Задает цену ордера для предмета."""
+        self.desired[(item.class_id, item.instance_id)] = (item, price)
+
+    def remove(self, item: Item) -> None:
+        """Убирает предмет из желаемого состояния, его ордер будет удален при следующей сверке."""
+        self.desired.pop((item.class_id, item.instance_id), None)
+
+    def replace(self, desired: Dict[OrderKey, Tuple[Item, int]]) -> None:
+        """
+        Подменяет желаемое состояние целиком одним присваиванием.
+
+        Идущая сверка дорабатывает со своим OrderDiff, следующая видит уже новое состояние.
+
+        :param desired: {(class_id, instance_id): (item, price)}
+        """
+        self.desired = desired
+
+    @staticmethod
+    def index_orders(orders: Iterable[dict]) -> Dict[OrderKey, dict]:
+        """
+        Индексирует ответ GetOrders.
+
+        :param orders: orders from CSGOMarketAPI.get_orders().
+        :return: {(class_id, instance_id): order}
+        """
+        return {(int(order['i_classid']), int(order['i_instanceid'])): order for order in orders}
+
+    def diff(self, orders: Iterable[dict]) -> OrderDiff:
+        """
+        Сравнивает текущие ордера с желаемым состоянием.
+
+        :param orders: orders from CSGOMarketAPI.get_orders().
+        :return: OrderDiff.
+        """
+        current = self.index_orders(orders)
+        result = OrderDiff([], [], [])
+        for key, (item, price) in self.desired.items():
+            order = current.get(key)
+            if order is None:
+                result.insert.append((item, price))
+            elif int(float(order['o_price'])) != price:
+                result.update.append((item, price))
+        if self.delete_unknown:
+            for key, order in current.items():
+                if key not in self.desired:
+                    result.delete.append(Item(key[0], key[1], order.get('i_market_name'),
+                                              order.get('i_market_hash_name'), order.get('i_hash')))
+        return result
+
+    async def apply(self, bot, diff: OrderDiff) -> None:
+        """
+        Отправляет изменения тремя пакетами: сначала удаление, затем изменение цен, затем новые ордера.
+
+        Внутри пакета запросы идут одновременно в рамках лимита, ошибки отдельных ордеров логируются.
+
+        :param bot: CSGOMarketAPI.
+        :param diff: OrderDiff.
+        """
+        if diff.delete:
+            for result in await bot.delete_orders(diff.delete):
+                self._log(result, 'Удаление лота.')
+        if diff.update:
+            for result in await bot.update_orders(diff.update):
+                self._log(result, f'Изменение цены лота на {result.price / 100} ₽.')
+        if diff.insert:
+            for result in await bot.insert_orders(diff.insert):
+                self._log(result, 'Выставление нового лота.')
+
+    @staticmethod
+    def _log(result: OrderResult, action: str) -> None:
+        if result.success:
+            logging.info(f'Предмет "{result.item.market_name}". {action}')
+        elif isinstance(result.error, InsufficientFundsException):
+            logging.warning(f'Предмет "{result.item.market_name}". Недостаточно средств. {action}')
+        else:
+            logging.warning(f'Предмет "{result.item.market_name}". Не удалось: {action} {result.error or ""}')
+
+    async def sync(self, bot) -> OrderDiff:
+        """
+        Получает текущие ордера, сверяет и отправляет только необходимые изменения.
+
+        :param bot: CSGOMarketAPI.
+        :return: applied OrderDiff.
+        """
+        diff = self.diff(await bot.get_orders())
+        if diff:
+            await self.apply(bot, diff)
+        return diff
@@ -0,0 +1,149 @@
+import asyncio
+import itertools
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, Iterable, Iterator, List
+
+from .CSGOMarketAPI import *
+from .Cache import *
+from .Item import *
+from .ItemStore import *
+from .RateLimiter import *
+from .Transport import *
+from .types import *
+
+__all__ = ['CSGOMarketPool']
+
+
+class CSGOMarketPool:
+    """
+    Пул клиентов для нескольких API ключей в одном event loop.
+
+    У каждого ключа свой CSGOMarketAPI со своим лимитером, балансом и циклом онлайна,
+    а транспорт (пул соединений) общий. Чтение, не привязанное к аккаунту (MassInfo,
+    ItemInfo, предложения и история), распределяется по наименее загруженным ключам.
+    Ордера и баланс выполняются только через клиента владельца: ``pool[key].insert_order(...)``.
+    """
+
+    def __init__(self, api_keys: Iterable[str], transport: BaseTransport = None,
+                 cache: ResponseCache = None, item_store: ItemStore = None, executor: Executor = None) -> None:
+        """
+        :param api_keys: API keys of accounts.
+        :param transport: shared transport, by default AiohttpTransport sized for all keys.
+        :param cache: optional cache shared by all clients.
+        :param item_store: optional persistent item metadata cache shared by all clients.
+        :param executor: optional pool for decoding large responses shared by all clients.
+        """
+        api_keys = list(api_keys)
+        # каждый ключ держит в пути до 4 запросов, общий пул соединений не должен их ограничивать
+        self.transport = transport if transport is not None else AiohttpTransport(limit=4 * max(1, len(api_keys)))
+        self.clients: Dict[str, CSGOMarketAPI] = {
+            key: CSGOMarketAPI(key, self.transport, cache, item_store, executor) for key in api_keys}
+        if not self.clients:
+            raise AttributeError('At least one API key is required')
+        self._load = {key: 0 for key in self.clients}
+        self._order = itertools.cycle(list(self.clients))
+
+    def __getitem__(self, api_key: str) -> CSGOMarketAPI:
+        return self.clients[api_key]
+
+    def __iter__(self) -> Iterator[CSGOMarketAPI]:
+        return iter(self.clients.values())
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    async def __aenter__(self) -> 'CSGOMarketPool':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Закрывает общий транспорт и синхронные сессии клиентов."""
+        await self.transport.close()
+        for client in self:
+            client.sync_transport.close()
+
+    def pick(self) -> CSGOMarketAPI:
+        """
+        Выбирает наименее загруженный ключ для чтения.
+
+        Нагрузка — число уже распределенных на ключ запросов пула плюс очередь его лимитера.
+        При равной нагрузке ключи перебираются по кругу.
+        """
+        start = next(self._order)
+        keys = list(self.clients)
+        offset = keys.index(start)
+        keys = keys[offset:] + keys[:offset]
+        return self.clients[min(keys, key=lambda k: self._load[k] + self.clients[k].limiter.queue_depth)]
+
+    async def _read(self, method: str, *args, **kwargs):
+        client = self.pick()
+        self._load[client.API_KEY] += 1
+        try:
+            return await getattr(client, method)(*args, **kwargs)
+        finally:
+            self._load[client.API_KEY] -= 1
+
+    async def item_info(self, item: ImportItemType, language: str = 'ru') -> Item:
+        return await self._read('item_info', item, language)
+
+    async def item_history(self, item: Item or ImportItemType) -> dict:
+        return await self._read('item_history', item)
+
+    async def sell_offers(self, item: Item or ImportItemType) -> dict:
+        return await self._read('sell_offers', item)
+
+    async def best_sell_offer(self, item: Item or ImportItemType) -> dict:
+        return await self._read('best_sell_offer', item)
+
+    async def buy_offers(self, item: Item or ImportItemType) -> dict:
+        return await self._read('buy_offers', item)
+
+    async def best_buy_offer(self, item: Item or ImportItemType) -> dict:
+        return await self._read('best_buy_offer', item)
+
+    async def market_history(self):
+        return await self._read('market_history')
+
+    async def _mass_info_batch(self, items: MassInfoListType, sell: int, buy: int,
+                               history: int, info: int) -> List[dict]:
+        """Пачка MassInfo через наименее загруженный ключ."""
+        return await self._read('_mass_info_batch', items, sell, buy, history, info)
+
+    async def mass_info(self, items: MassInfoListType, sell: int = 0, buy: int = 0,
+                        history: int = 0, info: int = 2) -> List[Item]:
+        """
+        CSGOMarketAPI.mass_info, пачки по 100 предметов распределяются по всем ключам пула.
+
+        :return: List of items with info in the order of `items`.
+        """
+        return await CSGOMarketAPI._collect_mass_info(self._mass_info_batch, items, sell, buy, history, info)
+
+    async def mass_info_iter(self, items: MassInfoListType, sell: int = 0, buy: int = 0,
+                             history: int = 0, info: int = 2) -> AsyncIterator[Item]:
+        """CSGOMarketAPI.mass_info_iter с распределением пачек по ключам пула."""
+        async for item in CSGOMarketAPI._stream_mass_info(self._mass_info_batch, items, sell, buy, history, info):
+            yield item
+
+    async def stay_online_loop(self) -> None:
+        """Держит онлайн все аккаунты пула, при отмене выводит их из онлайна."""
+        await asyncio.gather(*(client.stay_online_loop() for client in self))
+
+    async def shutdown(self, flush: Priority = Priority.TRADE, timeout: float = 5.0) -> Dict[str, ShutdownReport]:
+        """
+        CSGOMarketAPI.shutdown для всех аккаунтов одновременно.
+
+        :return: {api_key: ShutdownReport}
+        """
+        reports = await asyncio.gather(*(client.shutdown(flush, timeout) for client in self))
+        return dict(zip(self.clients, reports))
+
+    async def get_money(self) -> Dict[str, int]:
+        """
+        Обновляет балансы всех аккаунтов.
+
+        :return: {api_key: balance in kopecks}
+        """
+        balances = await asyncio.gather(*(client.get_money() for client in self))
+        return dict(zip(self.clients, balances))
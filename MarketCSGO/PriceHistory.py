@@ -0,0 +1,186 @@
+from array import array
+from collections import Counter, deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from .Item import *
+from .types import *
+
+__all__ = ['PriceHistory', 'PriceSeries']
+
+ItemKey = Tuple[int, int]
+
+
+def _item_key(item: Item or ImportItemType) -> ItemKey:
+    if isinstance(item, Item):
+        return item.class_id, item.instance_id
+    return int(item['class_id']), int(item['instance_id'])
+
+
+class PriceSeries:
+    """
+    Временной ряд сделок одного предмета в виде колонок `array`.
+
+    Сделки хранятся отсортированными по времени. Пересекающиеся окна ответов
+    (ItemHistory отдает последние 500 сделок при каждом запросе) отбрасываются:
+    сделки старше последней известной игнорируются, а сделки с тем же временем
+    сравниваются по количеству одинаковых цен.
+    """
+
+    __slots__ = ('times', 'prices', '_boundary')
+
+    def __init__(self) -> None:
+        self.times = array('q')
+        self.prices = array('q')
+        self._boundary = Counter()
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return self.times[-1] if self.times else None
+
+    def ingest(self, deals: Iterable[Tuple[int, int]]) -> int:
+        """
+        Добавляет новые сделки из очередного ответа.
+
+        :param deals: (time, price) pairs in any order.
+        :return: number of added deals.
+        """
+        last_time = self.last_time
+        fresh = sorted(deal for deal in deals if last_time is None or deal[0] >= last_time)
+        if not fresh:
+            return 0
+        if last_time is not None:
+            seen = Counter(self._boundary)
+            filtered = []
+            for deal in fresh:
+                if deal[0] == last_time and seen[deal[1]] > 0:
+                    seen[deal[1]] -= 1
+                    continue
+                filtered.append(deal)
+            fresh = filtered
+            if not fresh:
+                return 0
+        new_last_time = fresh[-1][0]
+        if new_last_time != last_time:
+            self._boundary = Counter()
+        for deal_time, price in fresh:
+            self.times.append(deal_time)
+            self.prices.append(price)
+            if deal_time == new_last_time:
+                self._boundary[price] += 1
+        return len(fresh)
+
+    def _window(self, n: Optional[int]) -> array:
+        return self.prices if n is None or n >= len(self.prices) else self.prices[-n:]
+
+    def vwap(self, n: Optional[int] = None) -> Optional[float]:
+        """
+        Средневзвешенная по объему цена последних `n` сделок.
+
+        Каждая сделка на площадке — один предмет, поэтому вес у всех сделок одинаковый.
+
+        :param n: number of last deals, all deals by default.
+        """
+        window = self._window(n)
+        return sum(window) / len(window) if window else None
+
+    def percentile(self, q: float, n: Optional[int] = None) -> Optional[float]:
+        """
+        Перцентиль цены последних `n` сделок с линейной интерполяцией.
+
+        :param q: percentile in range [0, 100].
+        :param n: number of last deals, all deals by default.
+        """
+        if not 0 <= q <= 100:
+            raise AttributeError('`q` value must be in range [0, 100]')
+        window = sorted(self._window(n))
+        if not window:
+            return None
+        position = (len(window) - 1) * q / 100
+        low = int(position)
+        high = min(low + 1, len(window) - 1)
+        return window[low] + (window[high] - window[low]) * (position - low)
+
+    def rolling_min(self, window: int) -> array:
+        """Минимум цены в скользящем окне из `window` сделок для каждой сделки ряда."""
+        return self._rolling(window, lambda a, b: a <= b)
+
+    def rolling_max(self, window: int) -> array:
+        """Максимум цены в скользящем окне из `window` сделок для каждой сделки ряда."""
+        return self._rolling(window, lambda a, b: a >= b)
+
+    def _rolling(self, window: int, better) -> array:
+        if window < 1:
+            raise AttributeError('`window` value must be positive')
+        prices = self.prices
+        result = array('q')
+        candidates = deque()
+        for index, price in enumerate(prices):
+            while candidates and better(price, prices[candidates[-1]]):
+                candidates.pop()
+            candidates.append(index)
+            if candidates[0] <= index - window:
+                candidates.popleft()
+            result.append(prices[candidates[0]])
+        return result
+
+
+class PriceHistory:
+    """Хранилище истории цен по предметам, пополняемое ответами item_history и history."""
+
+    def __init__(self) -> None:
+        self.series: Dict[ItemKey, PriceSeries] = {}
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    def __contains__(self, item: Item or ImportItemType) -> bool:
+        return _item_key(item) in self.series
+
+    def get(self, item: Item or ImportItemType) -> Optional[PriceSeries]:
+        """Ряд сделок предмета или None."""
+        return self.series.get(_item_key(item))
+
+    def _series(self, key: ItemKey) -> PriceSeries:
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = PriceSeries()
+        return series
+
+    def ingest_item_history(self, item: Item or ImportItemType, response: dict) -> int:
+        """
+        Добавляет сделки из ответа CSGOMarketAPI.item_history.
+
+        :param item: filled Item or {class_id: int, instance_id: int}.
+        :param response: item_history() result.
+        :return: number of added deals.
+        """
+        deals = response.get('history') or []
+        return self._series(_item_key(item)).ingest(
+            (int(deal['l_time']), int(float(deal['l_price']))) for deal in deals)
+
+    def ingest_market_history(self, response) -> int:
+        """
+        Добавляет сделки из ответа CSGOMarketAPI.history по всей площадке.
+
+        :param response: history() result, list of deals or dict of deals.
+        :return: number of added deals.
+        """
+        deals = response.values() if isinstance(response, dict) else response
+        grouped = {}
+        for deal in deals:
+            key = int(deal['classid']), int(deal['instanceid'])
+            grouped.setdefault(key, []).append((int(deal['time']), int(float(deal['price']))))
+        return sum(self._series(key).ingest(item_deals) for key, item_deals in grouped.items())
+
+    async def refresh(self, api, item: Item or ImportItemType) -> int:
+        """
+        Запрашивает item_history и добавляет новые сделки.
+
+        :param api: CSGOMarketAPI.
+        :param item: filled Item or {class_id: int, instance_id: int}.
+        :return: number of added deals.
+        """
+        return self.ingest_item_history(item, await api.item_history(item))
@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Dict, Optional
+
+__all__ = ['Priority', 'RateLimiter']
+
+
+class Priority(IntEnum):
+    """Приоритет запроса в очереди лимитера, меньшее значение обслуживается раньше."""
+    CRITICAL = 0  # PingPong, GoOffline
+    TRADE = 1  # InsertOrder, UpdateOrder
+    DEFAULT = 2
+    BULK = 3  # MassInfo, ItemHistory
+
+
+class RateLimiter:
+    """
+    Лимитер запросов со скользящим окном и приоритетной очередью.
+
+    Слот занят с момента выдачи до вызова :meth:`release` после получения ответа и еще
+    ``period`` секунд после этого. Так сервер, считающий запросы по времени их прихода,
+    никогда не увидит больше ``max_requests`` запросов в окне, даже если задержка сети
+    у соседних запросов разная. Ожидающие будятся таймером ровно в момент освобождения
+    слота, без опроса, и обслуживаются по приоритету, внутри одного приоритета — в порядке очереди.
+
+    Последние `reserved` слотов достаются только запросам CRITICAL: медленные запросы в пути
+    не могут занять все окно, и PingPong или GoOffline ждут слот не дольше одного ``period``.
+    """
+
+    def __init__(self, max_requests: int = 4, period: float = 1.0, reserved: int = 1) -> None:
+        """
+        :param max_requests: max requests in one window.
+        :param period: window length in seconds.
+        :param reserved: slots available only for CRITICAL requests, at least one slot is left for others.
+        """
+        self.max_requests = max_requests
+        self.period = period
+        self.reserved = max(0, min(reserved, max_requests - 1))
+        self._timestamps = deque()
+        self._in_flight = 0
+        self._loop = None
+        self._waiters = []
+        self._pending = 0
+        self._counter = itertools.count()
+        self._timer = None
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество запросов, ожидающих слот."""
+        return self._pending
+
+    def _prune(self, now: float) -> None:
+        border = now - self.period
+        while self._timestamps and self._timestamps[0] <= border:
+            self._timestamps.popleft()
+
+    def _limit(self, priority: Priority) -> int:
+        return self.max_requests if priority == Priority.CRITICAL else self.max_requests - self.reserved
+
+    def free_slots(self, priority: Priority = Priority.DEFAULT) -> int:
+        """Количество слотов, доступных прямо сейчас запросу с приоритетом `priority`."""
+        self._prune(time.monotonic())
+        return max(0, self._limit(priority) - self._in_flight - len(self._timestamps))
+
+    def delay(self, priority: Priority = Priority.DEFAULT) -> Optional[float]:
+        """
+        Время в секундах до освобождения слота для запроса с приоритетом `priority`, 0 если слот свободен.
+
+        :return: None if slots are taken by requests in flight.
+        """
+        now = time.monotonic()
+        self._prune(now)
+        excess = self._in_flight + len(self._timestamps) - self._limit(priority)
+        if excess < 0:
+            return 0.0
+        if excess >= len(self._timestamps):
+            return None
+        return self._timestamps[excess] + self.period - now
+
+    def acquire_nowait(self, priority: Priority = Priority.DEFAULT) -> bool:
+        """
+        Занимает слот без ожидания, после запроса слот нужно вернуть через :meth:`release`.
+
+        Запросы с приоритетом ниже CRITICAL не обгоняют уже ожидающих в очереди.
+
+        :return: True if slot was acquired.
+        """
+        self._prune(time.monotonic())
+        if self._in_flight + len(self._timestamps) >= self._limit(priority):
+            return False
+        if self._pending and priority != Priority.CRITICAL:
+            return False
+        self._in_flight += 1
+        self.acquired += 1
+        return True
+
+    def release(self) -> None:
+        """Освобождает слот после получения ответа, слот станет доступен через period секунд."""
+        self._in_flight -= 1
+        self._timestamps.append(time.monotonic())
+        if self._pending and self._loop is not None:
+            self._schedule(self._loop)
+
+    async def acquire(self, priority: Priority = Priority.DEFAULT) -> float:
+        """
+        Ожидает свободный слот.
+
+        После завершения запроса слот нужно вернуть через :meth:`release`.
+
+        :param priority: request priority.
+        :return: waiting time in seconds.
+        """
+        if self.acquire_nowait(priority):
+            return 0.0
+        loop = self._loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        enqueued = time.monotonic()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._pending += 1
+        self._schedule(loop)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done() or future.cancelled():
+                self._pending -= 1
+            elif future.exception() is None:
+                self.release()
+            raise
+        waited = time.monotonic() - enqueued
+        self.waited += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def cancel_waiting(self, priority: Priority, error: Callable[[], Exception]) -> Dict[Priority, int]:
+        """
+        Снимает из очереди ожидающих с приоритетом `priority` и ниже, их acquire завершится ошибкой.
+
+        :param priority: least urgent priority which is kept in queue is the previous one.
+        :param error: exception factory, e.g. exception class.
+        :return: {priority: number of cancelled waiters}
+        """
+        kept, cancelled = [], {}
+        for entry in self._waiters:
+            waiter_priority, _, future = entry
+            if future.done():
+                continue
+            if waiter_priority >= priority:
+                future.set_exception(error())
+                self._pending -= 1
+                cancelled[waiter_priority] = cancelled.get(waiter_priority, 0) + 1
+            else:
+                kept.append(entry)
+        heapq.heapify(kept)
+        self._waiters = kept
+        return cancelled
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None or not self._pending:
+            return
+        delay = self.delay(self._waiters[0][0])
+        if delay is not None:
+            self._timer = loop.call_later(delay, self._wake, loop)
+
+    def _wake(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        self._prune(time.monotonic())
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._in_flight + len(self._timestamps) >= self._limit(priority):
+                break
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            self.acquired += 1
+            self._pending -= 1
+            future.set_result(None)
+        self._schedule(loop)
+
+    def stats(self) -> dict:
+        """
+        Статистика лимитера.
+
+        :return: dict with queue depth, acquired slots count and waiting time stats.
+        """
+        return {
+            'queue_depth': self.queue_depth,
+            'in_flight': self._in_flight,
+            'reserved': self.reserved,
+            'acquired': self.acquired,
+            'waited': self.waited,
+            'total_wait': self.total_wait,
+            'max_wait': self.max_wait,
+            'avg_wait': self.total_wait / self.waited if self.waited else 0.0,
+        }
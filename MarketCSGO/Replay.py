@@ -0,0 +1,149 @@
+import asyncio
+import base64
+import gzip
+import json
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, IO, Iterator, Optional, Tuple
+
+from .Transport import *
+
+__all__ = ['RecordingTransport', 'ReplayTransport', 'ReplayMissError', 'read_records']
+
+_KEY_PARAM = re.compile(r'([?&]key=)[^&]*')
+
+
+def _normalize_url(url: str) -> str:
+    """URI без API ключа: ключ не попадает в запись, а запись подходит для любого ключа."""
+    return _KEY_PARAM.sub(r'\1*', url)
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    Читает записи из файла RecordingTransport.
+
+    :param path: JSON lines file, gzip compressed if name ends with .gz.
+    """
+    with _open(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ReplayMissError(LookupError):
+    """Запрос, которого нет в записи."""
+
+
+class RecordingTransport(BaseTransport):
+    """
+    Транспорт-обертка, записывающий пары запрос/ответ с временем выполнения.
+
+    Запись ведется ниже validate_response, то есть сохраняются и ответы с ошибками.
+    Файл — JSON lines, по строке на запрос, только дописывается; с расширением .gz
+    сжимается gzip. API ключ из URI в запись не попадает.
+    """
+
+    def __init__(self, transport: BaseTransport, path: str) -> None:
+        """
+        :param transport: real transport, e.g. AiohttpTransport.
+        :param path: record file.
+        """
+        self.transport = transport
+        self.path = path
+        self.started = time.monotonic()
+        self.records = 0
+        self._file = _open(path, 'a')
+
+    async def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        sent = time.monotonic() - self.started
+        response = await self.transport.request(method, url, data)
+        try:
+            body, encoding = response.content.decode('utf-8'), None
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(response.content).decode('ascii'), 'base64'
+        record = {'at': round(sent, 6), 'method': method, 'url': _normalize_url(url), 'data': data,
+                  'status': response.status_code, 'headers': response.headers,
+                  'elapsed': round(response.elapsed, 6), 'body': body}
+        if encoding is not None:
+            record['encoding'] = encoding
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+        self.records += 1
+        return response
+
+    async def download(self, url: str, path: str) -> Response:
+        """Загрузки файлов не записываются, они идут напрямую через исходный транспорт."""
+        return await self.transport.download(url, path)
+
+    async def close(self) -> None:
+        await self.transport.close()
+        if not self._file.closed:
+            self._file.close()
+
+
+RequestKey = Tuple[str, str, str]
+
+
+class ReplayTransport(BaseTransport):
+    """
+    Транспорт, отдающий ответы из записи RecordingTransport без сети и API ключа.
+
+    Ответы на одинаковые запросы (метод, URI без ключа, данные формы) отдаются в порядке
+    записи; когда они заканчиваются, повторяется последний. Задержка ответа — записанная,
+    умноженная на `latency_scale`: 0 убирает ожидание, 2 вдвое замедляет API.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0, strict: bool = False) -> None:
+        """
+        :param path: record file.
+        :param latency_scale: multiplier of recorded latencies.
+        :param strict: raise ReplayMissError when recorded responses for request are exhausted.
+        """
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.responses: Dict[RequestKey, Deque[dict]] = {}
+        self._last: Dict[RequestKey, dict] = {}
+        self.replayed = 0
+        self.repeated = 0
+        for record in read_records(path):
+            key = self._key(record['method'], record['url'], record['data'])
+            self.responses.setdefault(key, deque()).append(record)
+
+    @staticmethod
+    def _key(method: str, url: str, data: Optional[dict]) -> RequestKey:
+        return method, _normalize_url(url), json.dumps(data, sort_keys=True) if data else ''
+
+    async def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        key = self._key(method, url, data)
+        queue = self.responses.get(key)
+        if queue:
+            record = self._last[key] = queue.popleft()
+        elif key in self._last and not self.strict:
+            record = self._last[key]
+            self.repeated += 1
+        else:
+            raise ReplayMissError(f'{method} {_normalize_url(url)} is not recorded')
+        self.replayed += 1
+        delay = record['elapsed'] * self.latency_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body = record['body']
+        content = base64.b64decode(body) if record.get('encoding') == 'base64' else body.encode('utf-8')
+        return Response(record['status'], record['headers'], content, delay)
+
+    async def download(self, url: str, path: str) -> Response:
+        raise ReplayMissError(f'Downloads are not recorded: {_normalize_url(url)}')
+
+    def stats(self) -> dict:
+        return {
+            'replayed': self.replayed,
+            'repeated': self.repeated,
+            'left': sum(len(queue) for queue in self.responses.values()),
+        }
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Tuple, Type
+
+from .Exceptions import *
+from .RateLimiter import *
+
+__all__ = ['RetryPolicy', 'CircuitBreaker', 'NO_RETRY', 'DEFAULT_RETRY_POLICIES']
+
+
+class RetryPolicy:
+    """Политика повторов с экспоненциальной задержкой и full jitter."""
+
+    __slots__ = ('max_attempts', 'base_delay', 'max_delay', 'retry_on')
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0,
+                 retry_on: Tuple[Type[Exception], ...] = (BadGatewayError, NetworkError)) -> None:
+        """
+        :param max_attempts: total attempts including the first one.
+        :param base_delay: delay before first retry in seconds, doubles every attempt.
+        :param max_delay: upper bound of delay in seconds.
+        :param retry_on: transient exceptions which may be retried.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def delay(self, attempt: int) -> float:
+        """
+        Случайная задержка перед повтором.
+
+        :param attempt: number of failed attempts, starting from 1.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+# InsertOrder не идемпотентен: повтор после обрыва соединения может выставить второй ордер
+DEFAULT_RETRY_POLICIES = {
+    'InsertOrder': NO_RETRY,
+    'PingPong': RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=15.0),
+    'GoOffline': RetryPolicy(max_attempts=3, base_delay=0.2, max_delay=1.0),
+}
+
+
+class CircuitBreaker:
+    """
+    Предохранитель на время недоступности API.
+
+    После `failure_threshold` временных ошибок подряд предохранитель размыкается, и
+    некритичные запросы ждут `reset_timeout` секунд. Затем уходит один пробный запрос:
+    успех замыкает предохранитель, ошибка снова размыкает. Запросы с приоритетом
+    CRITICAL (PingPong, GoOffline) проходят всегда.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """
+        :param failure_threshold: consecutive transient failures to open breaker.
+        :param reset_timeout: pause before probe request in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._probing = False
+        self._changed = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    async def wait(self, priority: Priority) -> bool:
+        """
+        Ожидает, пока запрос можно отправить.
+
+        :return: True if request is a probe, its outcome must be reported.
+        """
+        while priority != Priority.CRITICAL and self.opened_at is not None:
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining <= 0 and not self._probing:
+                self._probing = True
+                return True
+            if self._changed is None:
+                self._changed = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining if remaining > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.opened_at is not None:
+            logging.info('API is available again, circuit breaker closed')
+            self.opened_at = None
+            self._probing = False
+            self._notify()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                self.trips += 1
+                logging.warning('API is unavailable, pausing non-critical requests for %.0f s', self.reset_timeout)
+            self.opened_at = time.monotonic()
+            self._probing = False
+            self._notify()
+
+    def end_probe(self) -> None:
+        """Снимает пометку пробного запроса, если он завершился без результата (например, был отменен)."""
+        if self._probing:
+            self._probing = False
+            self._notify()
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from .RateLimiter import *
+
+__all__ = ['Job', 'Scheduler']
+
+
+class Job:
+    """Периодическая задача планировщика."""
+
+    __slots__ = ('name', 'func', 'interval', 'current_interval', 'min_interval', 'max_interval', 'deadline',
+                 'priority', 'adaptive', 'next_run', 'last_run', 'last_success', 'runs', 'failures',
+                 'missed_deadlines')
+
+    def __init__(self, name: str, func: Callable[[], Awaitable], interval: float,
+                 priority: Priority = Priority.DEFAULT, deadline: Optional[float] = None,
+                 adaptive: bool = False, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, delay: float = 0) -> None:
+        """
+        :param name: unique job name.
+        :param func: coroutine function, for adaptive jobs returns True when observed data has changed.
+        :param interval: base interval between runs in seconds.
+        :param priority: CRITICAL jobs are never slowed down when request budget is exhausted.
+        :param deadline: max time between successful runs in seconds.
+        :param adaptive: adapt interval to change rate of func results.
+        :param min_interval: lower bound of adaptive interval, interval / 4 by default.
+        :param max_interval: upper bound of adaptive interval, interval * 4 by default.
+        :param delay: delay before first run in seconds.
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.current_interval = interval
+        self.min_interval = min_interval if min_interval is not None else interval / 4
+        self.max_interval = max_interval if max_interval is not None else interval * 4
+        self.deadline = deadline
+        self.priority = priority
+        self.adaptive = adaptive
+        self.next_run = time.monotonic() + delay
+        self.last_run = None
+        self.last_success = None
+        self.runs = 0
+        self.failures = 0
+        self.missed_deadlines = 0
+
+
+class Scheduler:
+    """
+    Планировщик всех периодических задач клиента.
+
+    Задачи запускаются по своим интервалам в одном event loop. Интервалы некритичных
+    задач растягиваются, пока в лимитере есть очередь, а адаптивные задачи опрашивают
+    чаще, когда данные меняются, и реже, когда ничего не происходит. Интервал задачи
+    с deadline никогда не превышает его, а ее запросы должны идти с приоритетом
+    CRITICAL, чтобы обгонять массовое чтение в очереди лимитера.
+    """
+    RETRY_DELAY = 5
+
+    def __init__(self, limiter: Optional[RateLimiter] = None) -> None:
+        """
+        :param limiter: limiter whose queue depth is used to slow down non-critical jobs.
+        """
+        self.limiter = limiter
+        self.jobs: Dict[str, Job] = {}
+        self._wakeup = asyncio.Event()
+
+    def add(self, name: str, func: Callable[[], Awaitable], interval: float, **kwargs) -> Job:
+        """
+        Добавляет задачу, параметры как у :class:`Job`.
+
+        :return: Job.
+        """
+        job = Job(name, func, interval, **kwargs)
+        self.jobs[name] = job
+        self._wakeup.set()
+        return job
+
+    def remove(self, name: str) -> None:
+        self.jobs.pop(name, None)
+        self._wakeup.set()
+
+    def set_interval(self, name: str, interval: float, min_interval: Optional[float] = None,
+                     max_interval: Optional[float] = None) -> Job:
+        """
+        Меняет интервал задачи без ее перезапуска, идущий запуск не прерывается.
+
+        Границы адаптивного интервала по умолчанию такие же, как у :class:`Job`.
+
+        :return: Job.
+        """
+        job = self.jobs[name]
+        job.interval = job.current_interval = interval
+        job.min_interval = min_interval if min_interval is not None else interval / 4
+        job.max_interval = max_interval if max_interval is not None else interval * 4
+        job.next_run = min(job.next_run, (job.last_run if job.last_run is not None else time.monotonic()) + interval)
+        self._wakeup.set()
+        return job
+
+    def trigger(self, name: str) -> None:
+        """Запустить задачу как можно скорее."""
+        self.jobs[name].next_run = time.monotonic()
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Выполняет задачи до отмены."""
+        running = {}
+        try:
+            while True:
+                self._wakeup.clear()
+                now = time.monotonic()
+                due = [job for job in self.jobs.values() if job.next_run <= now and job.name not in running]
+                for job in sorted(due, key=lambda j: (j.priority, j.next_run)):
+                    task = asyncio.ensure_future(self._run_job(job))
+                    task.add_done_callback(lambda _, name=job.name: self._job_done(running, name))
+                    running[job.name] = task
+                waiting = [job.next_run for job in self.jobs.values() if job.name not in running]
+                timeout = max(0.0, min(waiting) - time.monotonic()) if waiting else None
+                # wait_for может потерять отмену, если событие выставлено в тот же момент
+                timer = asyncio.get_running_loop().call_later(timeout, self._wakeup.set) \
+                    if timeout is not None else None
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+        finally:
+            for task in running.values():
+                task.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+
+    def _job_done(self, running: dict, name: str) -> None:
+        running.pop(name, None)
+        self._wakeup.set()
+
+    async def _run_job(self, job: Job) -> None:
+        started = time.monotonic()
+        missed = self._check_deadline(job, started)
+        try:
+            result = await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            delay = min(job.current_interval, self.RETRY_DELAY * 2 ** (job.failures - 1))
+            logging.warning('Job %s failed (%s), retry in %.1f s', job.name, type(e).__name__, delay)
+            job.next_run = time.monotonic() + delay
+            return
+        finished = time.monotonic()
+        if not missed:
+            # запуск вовремя еще не значит успех вовремя: запросы задачи могли ждать лимитер
+            self._check_deadline(job, finished)
+        job.last_success = finished
+        job.runs += 1
+        job.failures = 0
+        job.last_run = started
+        job.next_run = started + self._next_interval(job, result)
+
+    @staticmethod
+    def _check_deadline(job: Job, now: float) -> bool:
+        if job.deadline is None or job.last_success is None or now - job.last_success <= job.deadline:
+            return False
+        job.missed_deadlines += 1
+        logging.warning('Job %s missed its deadline by %.1f s', job.name, now - job.last_success - job.deadline)
+        return True
+
+    def _next_interval(self, job: Job, result) -> float:
+        if job.adaptive:
+            if result is True:
+                job.current_interval = max(job.min_interval, job.current_interval / 2)
+            else:
+                job.current_interval = min(job.max_interval, job.current_interval * 1.5)
+        interval = job.current_interval
+        if job.priority > Priority.CRITICAL and self.limiter is not None:
+            interval *= 1 + self.limiter.queue_depth / self.limiter.max_requests
+        if job.deadline is not None:
+            interval = min(interval, job.deadline)
+        return interval
+
+    def stats(self) -> dict:
+        """Статистика по задачам: текущий интервал, число запусков, ошибок и пропущенных дедлайнов."""
+        return {name: {'interval': job.current_interval, 'runs': job.runs, 'failures': job.failures,
+                       'missed_deadlines': job.missed_deadlines} for name, job in self.jobs.items()}
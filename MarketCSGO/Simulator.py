@@ -0,0 +1,249 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+import zlib
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .Transport import *
+
+__all__ = ['MarketSimulator']
+
+ItemKey = Tuple[int, int]
+
+
+class MarketSimulator(BaseTransport):
+    """
+    Локальный in-process стенд market.csgo.com.
+
+    Подключается к клиенту как транспорт: ``CSGOMarketAPI(key, transport=MarketSimulator())``.
+    Реализует методы, которые использует клиент, с настраиваемой задержкой,
+    случайными ответами 502 и собственным контролем лимита запросов на ключ.
+    Предметы генерируются детерминированно по class_id/instance_id.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 max_requests: int = 4, period: float = 1.0, balance: int = 100000,
+                 keys: Optional[Set[str]] = None, seed: Optional[int] = None) -> None:
+        """
+        :param latency: base response latency in seconds.
+        :param jitter: max random addition to latency in seconds.
+        :param error_rate: probability of 502 response.
+        :param max_requests: allowed API requests per key in `period`.
+        :param period: rate limit window in seconds.
+        :param balance: initial balance of every account in kopecks.
+        :param keys: valid API keys, any key is valid if not passed.
+        :param seed: random seed for latency and errors.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_requests = max_requests
+        self.period = period
+        self.initial_balance = balance
+        self.keys = keys
+        self.random = random.Random(seed)
+        self.balances: Dict[str, int] = {}
+        self.orders: Dict[str, Dict[ItemKey, int]] = {}
+        self.online: Dict[str, bool] = {}
+        self.trades = deque(maxlen=50)
+        self._trade_ids = itertools.count(1)
+        self.db_time = 1597000000
+        self._windows: Dict[str, deque] = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self.bad_gateway = 0
+        self.calls: Dict[str, int] = {}
+
+    @staticmethod
+    def base_price(class_id: int, instance_id: int) -> int:
+        """Детерминированная цена предмета в копейках."""
+        return 100 + zlib.crc32(f'{class_id}_{instance_id}'.encode()) % 100000
+
+    def item_info(self, class_id: int, instance_id: int) -> dict:
+        return {
+            'classid': str(class_id),
+            'instanceid': str(instance_id),
+            'market_name': f'Предмет {class_id}',
+            'market_hash_name': f'Item {class_id} | {instance_id}',
+            'hash': f'{zlib.crc32(str(class_id).encode()):08x}{instance_id:x}',
+            'our_market_instanceid': 'null',
+            'description': [],
+            'tags': [],
+        }
+
+    def add_trade(self, class_id: int, instance_id: int, price: Optional[int] = None) -> None:
+        """Добавляет сделку в ленту history и историю предмета."""
+        self.trades.appendleft({
+            'id': str(next(self._trade_ids)),
+            'classid': str(class_id),
+            'instanceid': str(instance_id),
+            'market_name': f'Предмет {class_id}',
+            'price': str(price if price is not None else self.base_price(class_id, instance_id)),
+            'time': int(time.time()),
+        })
+
+    async def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        self.requests += 1
+        delay = self.latency + (self.random.random() * self.jitter if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.bad_gateway += 1
+            return Response(502, {'content-type': 'text/html'}, b'<html>502 Bad Gateway</html>', delay)
+        parts = urlsplit(url)
+        path = [part for part in parts.path.split('/') if part]
+        key = parse_qs(parts.query).get('key', [''])[0]
+        try:
+            body = self._dispatch(path, key, data or {})
+        except (KeyError, IndexError, ValueError):
+            body = {'success': False, 'error': 'Bad request'}
+        content = json.dumps(body) if not isinstance(body, bytes) else body
+        content_type = 'application/json' if not isinstance(body, bytes) else 'text/csv'
+        return Response(200, {'content-type': content_type},
+                        content.encode() if isinstance(content, str) else content, delay)
+
+    def _rate_limit_exceeded(self, key: str) -> bool:
+        now = time.monotonic()
+        window = self._windows.setdefault(key, deque())
+        while window and window[0] <= now - self.period:
+            window.popleft()
+        if len(window) >= self.max_requests:
+            self.rate_limited += 1
+            return True
+        window.append(now)
+        return False
+
+    def _dispatch(self, path: list, key: str, data: dict):
+        if path[0] == 'history':
+            return list(self.trades)
+        if path[0] == 'itemdb':
+            if path[1] == 'current_730.json':
+                return {'time': self.db_time, 'db': f'items_730_{self.db_time}.csv'}
+            return self._itemdb_csv()
+        name = path[1]
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.keys is not None and key not in self.keys:
+            return {'error': 'Bad KEY'}
+        if self._rate_limit_exceeded(key):
+            return {'success': False, 'error': 'Too many requests, try later'}
+        handler = getattr(self, f'_api_{name}', None)
+        if handler is None:
+            return {'success': False, 'error': 'Unknown method'}
+        return handler(key, path[2:], data)
+
+    def _itemdb_csv(self) -> bytes:
+        lines = ['c_classid;c_instanceid;c_price;c_offers;c_popularity;c_market_name;c_market_name_en']
+        for class_id in range(1000, 1100):
+            info = self.item_info(class_id, 0)
+            lines.append(f'{class_id};0;{self.base_price(class_id, 0)};1;1;'
+                         f'{info["market_name"]};{info["market_hash_name"]}')
+        return '\n'.join(lines).encode()
+
+    @staticmethod
+    def _item_key(value: str) -> ItemKey:
+        class_id, instance_id = value.split('_')
+        return int(class_id), int(instance_id)
+
+    def _api_MassInfo(self, key: str, args: list, data: dict) -> dict:
+        sell, buy, history, info = (int(i) for i in args[:4])
+        results = []
+        for value in data['list'].split(','):
+            class_id, instance_id = self._item_key(value)
+            price = self.base_price(class_id, instance_id)
+            result = {'classid': str(class_id), 'instanceid': str(instance_id)}
+            if sell:
+                result['sell_offers'] = {'best_offer': price, 'offers': [[price, 1, 0]]}
+            if buy:
+                result['buy_offers'] = {'best_offer': price * 9 // 10, 'offers': [[price * 9 // 10, 1, 0]]}
+            if history:
+                result['history'] = {'max': price, 'min': price, 'average': price, 'number': 1,
+                                     'history': [[self.db_time, price]]}
+            if info:
+                result['info'] = self.item_info(class_id, instance_id)
+            results.append(result)
+        return {'success': True, 'results': results}
+
+    def _api_ItemInfo(self, key: str, args: list, data: dict) -> dict:
+        class_id, instance_id = self._item_key(args[0])
+        price = self.base_price(class_id, instance_id)
+        body = self.item_info(class_id, instance_id)
+        body['offers'] = [{'price': str(price), 'count': '1', 'my_count': '0'}]
+        body['buy_offers'] = [{'o_price': str(price * 9 // 10), 'c': '1', 'my_count': '0'}]
+        return body
+
+    def _offers(self, args: list) -> Tuple[ItemKey, int]:
+        class_id, instance_id = self._item_key(args[0])
+        return (class_id, instance_id), self.base_price(class_id, instance_id)
+
+    def _api_SellOffers(self, key: str, args: list, data: dict) -> dict:
+        _, price = self._offers(args)
+        return {'success': True, 'best_offer': str(price), 'offers': [{'price': str(price), 'count': '1'}]}
+
+    def _api_BestSellOffer(self, key: str, args: list, data: dict) -> dict:
+        _, price = self._offers(args)
+        return {'success': True, 'best_offer': str(price)}
+
+    def _api_BuyOffers(self, key: str, args: list, data: dict) -> dict:
+        _, price = self._offers(args)
+        return {'success': True, 'best_offer': str(price * 9 // 10),
+                'offers': [{'o_price': str(price * 9 // 10), 'c': '1'}]}
+
+    def _api_BestBuyOffer(self, key: str, args: list, data: dict) -> dict:
+        _, price = self._offers(args)
+        return {'success': True, 'best_offer': str(price * 9 // 10)}
+
+    def _api_ItemHistory(self, key: str, args: list, data: dict) -> dict:
+        _, price = self._offers(args)
+        history = [{'l_price': str(price + i % 7 - 3), 'l_time': str(self.db_time - i * 60)} for i in range(500)]
+        return {'success': True, 'max': price + 3, 'min': price - 3, 'average': price, 'number': 500,
+                'history': history}
+
+    def _api_GetMoney(self, key: str, args: list, data: dict) -> dict:
+        return {'money': self.balances.setdefault(key, self.initial_balance), 'currency': 'RUB'}
+
+    def _api_GetOrders(self, key: str, args: list, data: dict) -> dict:
+        orders = self.orders.get(key)
+        if not orders:
+            return {'success': True, 'Orders': 'No orders'}
+        return {'success': True, 'Orders': [
+            {'i_classid': str(class_id), 'i_instanceid': str(instance_id), 'o_price': str(price),
+             'i_market_name': f'Предмет {class_id}', 'o_state': 'active'}
+            for (class_id, instance_id), price in orders.items()]}
+
+    def _api_InsertOrder(self, key: str, args: list, data: dict) -> dict:
+        item_key, price = (int(args[0]), int(args[1])), int(args[2])
+        orders = self.orders.setdefault(key, {})
+        if item_key in orders:
+            return {'success': False, 'error': 'Order already exists'}
+        if price > self.balances.setdefault(key, self.initial_balance):
+            return {'success': False, 'error': 'Недостаточно средств на счету'}
+        orders[item_key] = price
+        return {'success': True}
+
+    def _api_UpdateOrder(self, key: str, args: list, data: dict) -> dict:
+        item_key, price = (int(args[0]), int(args[1])), int(args[2])
+        orders = self.orders.setdefault(key, {})
+        if item_key not in orders:
+            return {'success': False, 'error': 'Order not found'}
+        if price == 0:
+            del orders[item_key]
+        else:
+            orders[item_key] = price
+        return {'success': True}
+
+    def _api_PingPong(self, key: str, args: list, data: dict) -> dict:
+        self.online[key] = True
+        return {'success': True, 'ping': 'pong'}
+
+    def _api_GoOffline(self, key: str, args: list, data: dict) -> dict:
+        self.online[key] = False
+        return {'success': True}
+
+    def stats(self) -> dict:
+        """Счетчики запросов, отказов по лимиту и внедренных ошибок 502."""
+        return {'requests': self.requests, 'rate_limited': self.rate_limited,
+                'bad_gateway': self.bad_gateway, 'calls': dict(self.calls)}
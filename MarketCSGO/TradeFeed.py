@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Union
+
+from .RateLimiter import *
+from .Scheduler import *
+
+__all__ = ['Trade', 'TradeFeed', 'TradeStream']
+
+
+class Trade(NamedTuple):
+    """Сделка из ленты покупок торговой площадки."""
+    id: str
+    class_id: int
+    instance_id: int
+    market_name: Optional[str]
+    price: int
+    time: int
+
+    @staticmethod
+    def new_from_history(deal: dict) -> 'Trade':
+        class_id, instance_id = int(deal['classid']), int(deal['instanceid'])
+        price, deal_time = int(float(deal['price'])), int(deal['time'])
+        trade_id = deal.get('id') or f'{class_id}_{instance_id}_{deal_time}_{price}'
+        return Trade(str(trade_id), class_id, instance_id, deal.get('market_name'), price, deal_time)
+
+
+TradeCallback = Callable[[Trade], Union[None, Awaitable[None]]]
+
+
+class TradeStream:
+    """
+    Подписка на новые сделки с ограниченным буфером.
+
+    Когда буфер заполнен, при ``block=True`` лента ждет потребителя, и опрос замедляется
+    вместе с ним; при ``block=False`` вытесняются самые старые сделки, их число в `dropped`.
+    """
+
+    def __init__(self, feed: 'TradeFeed', maxsize: int, block: bool) -> None:
+        self.feed = feed
+        self.block = block
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    async def put(self, trade: Trade) -> None:
+        if self.block:
+            await self.queue.put(trade)
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(trade)
+
+    def close(self) -> None:
+        """Отписывается от ленты, уже полученные сделки остаются в буфере."""
+        self.feed.unsubscribe(self)
+
+    def __enter__(self) -> 'TradeStream':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __aiter__(self) -> 'TradeStream':
+        return self
+
+    async def __anext__(self) -> Trade:
+        return await self.queue.get()
+
+
+class TradeFeed:
+    """
+    Лента новых сделок всей площадки поверх ответа history.
+
+    Каждый опрос возвращает последние 50 покупок, из них отбираются еще не виденные,
+    множество увиденных id ограничено `seen_size`. Новые сделки передаются подписчикам
+    от старых к новым. Опрос выполняет Scheduler как адаптивная задача: пока сделки
+    появляются, лента опрашивается чаще, в тишине — реже.
+    """
+    HISTORY_SIZE = 50
+
+    def __init__(self, api, seen_size: int = 1000) -> None:
+        """
+        :param api: CSGOMarketAPI or CSGOMarketPool.
+        :param seen_size: how many last trade ids are remembered for deduplication, must exceed HISTORY_SIZE.
+        """
+        if seen_size <= self.HISTORY_SIZE:
+            raise AttributeError(f'`seen_size` must be greater than {self.HISTORY_SIZE}')
+        self.api = api
+        self.seen = set()
+        self._seen_order = deque()
+        self.seen_size = seen_size
+        self.callbacks: List[TradeCallback] = []
+        self.streams: List[TradeStream] = []
+        self.polls = 0
+        self.trades = 0
+        self.gaps = 0
+
+    def subscribe(self, callback: TradeCallback) -> TradeCallback:
+        """
+        Подписывает функцию на новые сделки.
+
+        Корутины ожидаются по очереди, поэтому медленный подписчик замедляет опрос.
+
+        :param callback: function or coroutine function with Trade argument.
+        :return: callback, for :meth:`unsubscribe`.
+        """
+        self.callbacks.append(callback)
+        return callback
+
+    def stream(self, maxsize: int = 1000, block: bool = False) -> TradeStream:
+        """
+        Подписка в виде асинхронного итератора::
+
+            with feed.stream() as trades:
+                async for trade in trades:
+                    ...
+
+        :param maxsize: buffer size.
+        :param block: wait for consumer instead of dropping old trades when buffer is full.
+        :return: TradeStream.
+        """
+        stream = TradeStream(self, maxsize, block)
+        self.streams.append(stream)
+        return stream
+
+    def unsubscribe(self, subscriber: Union[TradeCallback, TradeStream]) -> None:
+        if subscriber in self.streams:
+            self.streams.remove(subscriber)
+        elif subscriber in self.callbacks:
+            self.callbacks.remove(subscriber)
+
+    def _remember(self, trade_id: str) -> None:
+        self.seen.add(trade_id)
+        self._seen_order.append(trade_id)
+        if len(self._seen_order) > self.seen_size:
+            self.seen.discard(self._seen_order.popleft())
+
+    def extract_new(self, response) -> List[Trade]:
+        """
+        Отбирает новые сделки из ответа history и запоминает их.
+
+        :param response: history result, list of deals or dict of deals.
+        :return: new trades from oldest to newest.
+        """
+        deals = response.values() if isinstance(response, dict) else response
+        # history отдает сделки от новых к старым, время у соседних сделок может совпадать
+        trades = [Trade.new_from_history(deal) for deal in deals][::-1]
+        trades.sort(key=lambda t: t.time)
+        new = [trade for trade in trades if trade.id not in self.seen]
+        if self.polls and trades and len(new) == len(trades) and len(trades) >= self.HISTORY_SIZE:
+            self.gaps += 1
+            logging.debug('Trade feed may have missed trades, polling is too slow')
+        for trade in new:
+            self._remember(trade.id)
+        return new
+
+    async def poll(self) -> bool:
+        """
+        Один опрос ленты.
+
+        :return: True if new trades have appeared, for adaptive Scheduler job.
+        """
+        new = self.extract_new(await self.api.market_history())
+        self.polls += 1
+        self.trades += len(new)
+        for trade in new:
+            await self._publish(trade)
+        return bool(new)
+
+    async def _publish(self, trade: Trade) -> None:
+        for callback in list(self.callbacks):
+            try:
+                result = callback(trade)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logging.error('Trade feed subscriber %r failed: %s', callback, e)
+        for stream in list(self.streams):
+            await stream.put(trade)
+
+    def schedule(self, scheduler: Scheduler, interval: float = 10, min_interval: float = 2,
+                 max_interval: float = 60, name: str = 'trade_feed') -> Job:
+        """
+        Добавляет опрос ленты в планировщик.
+
+        :param scheduler: Scheduler.
+        :param interval: initial interval in seconds.
+        :param min_interval: interval while new trades keep appearing.
+        :param max_interval: interval of idle market.
+        :param name: job name.
+        :return: Job.
+        """
+        return scheduler.add(name, self.poll, interval, priority=Priority.BULK, adaptive=True,
+                             min_interval=min_interval, max_interval=max_interval)
+
+    def stats(self) -> dict:
+        return {
+            'polls': self.polls,
+            'trades': self.trades,
+            'gaps': self.gaps,
+            'dropped': sum(stream.dropped for stream in self.streams),
+        }
@@ -0,0 +1,208 @@
+import asyncio
+import contextlib
+import os
+import time
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from .Decoder import *
+from .Exceptions import NetworkError
+
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+
+__all__ = ['Response', 'BaseTransport', 'AiohttpTransport', 'SyncTransport']
+
+
+class Response:
+    """Ответ HTTP-запроса, не зависящий от используемого клиента."""
+
+    __slots__ = ('status_code', 'headers', 'content', 'elapsed')
+
+    def __init__(self, status_code: int, headers: dict, content: bytes, elapsed: float = 0.0) -> None:
+        """
+        :param status_code: HTTP status code.
+        :param headers: response headers, keys in lower case.
+        :param content: raw response body.
+        :param elapsed: request duration in seconds.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        """Тело ответа в виде строки."""
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        """Декодирует тело ответа как JSON."""
+        return loads(self.content)
+
+    def json_fields(self, fields: Iterable[str]) -> dict:
+        """Декодирует только указанные поля верхнего уровня, см. :func:`loads_fields`."""
+        return loads_fields(self.content, fields)
+
+
+class BaseTransport:
+    """
+    Базовый асинхронный транспорт.
+
+    Наследники должны реализовать :meth:`request`, остальные методы выражены через него.
+    """
+
+    async def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        """
+        Отправляет запрос и возвращает полностью прочитанный ответ.
+
+        :param method: HTTP method, 'GET' or 'POST'.
+        :param url: request URI.
+        :param data: form data for POST requests.
+        :raises NetworkError: connection error or timeout.
+        :return: Response.
+        """
+        raise NotImplementedError
+
+    async def get(self, url: str) -> Response:
+        return await self.request('GET', url)
+
+    async def post(self, url: str, data: dict) -> Response:
+        return await self.request('POST', url, data)
+
+    async def download(self, url: str, path: str) -> Response:
+        """
+        Скачивает файл по GET запросу на диск.
+
+        Реализация по умолчанию читает ответ целиком, транспорты с поддержкой потоков переопределяют её.
+        Файл появляется по пути `path` только после успешной загрузки.
+
+        :param url: file URI.
+        :param path: destination path.
+        :return: Response without content.
+        """
+        response = await self.get(url)
+        if response.status_code == 200:
+            with open(path + '.part', 'wb') as file:
+                file.write(response.content)
+            os.replace(path + '.part', path)
+        return Response(response.status_code, response.headers, b'', response.elapsed)
+
+    async def close(self) -> None:
+        """Освобождает ресурсы транспорта."""
+        pass
+
+
+class AiohttpTransport(BaseTransport):
+    """
+    Транспорт на aiohttp с одной долгоживущей сессией.
+
+    aiohttp импортируется при первом запросе, а не при импорте пакета.
+
+    Сессия создается при первом запросе и переиспользует соединения (keep-alive),
+    DNS-кэш и TLS-сессии между всеми методами клиента.
+    """
+
+    def __init__(self, limit: int = 8, timeout: float = 30, keepalive_timeout: float = 60,
+                 dns_cache_ttl: int = 300) -> None:
+        """
+        :param limit: max simultaneous connections in pool.
+        :param timeout: total timeout of one request in seconds.
+        :param keepalive_timeout: how long idle connection stays open.
+        :param dns_cache_ttl: DNS cache lifetime in seconds.
+        """
+        self.limit = limit
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session = None
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """Пул соединений, создается лениво внутри работающего event loop."""
+        if self._session is None or self._session.closed:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=self.dns_cache_ttl,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        import aiohttp
+        started = time.monotonic()
+        try:
+            async with self.session.request(method, url, data=data) as response:
+                content = await response.read()
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                return Response(response.status, headers, content, time.monotonic() - started)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise NetworkError(f'{type(e).__name__}: {e}') from e
+
+    async def download(self, url: str, path: str, chunk_size: int = 64 * 1024) -> Response:
+        import aiohttp
+        started = time.monotonic()
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=self.timeout)
+        try:
+            async with self.session.get(url, timeout=timeout) as response:
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                if response.status == 200:
+                    with open(path + '.part', 'wb') as file:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            file.write(chunk)
+                    os.replace(path + '.part', path)
+                return Response(response.status, headers, b'', time.monotonic() - started)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise NetworkError(f'{type(e).__name__}: {e}') from e
+        finally:
+            # после успешной загрузки .part уже переименован, иначе недокачанный файл удаляется
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path + '.part')
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class SyncTransport:
+    """
+    Синхронный фасад поверх requests.Session.
+
+    Нужен там, где event loop уже недоступен, например при аварийном завершении (sync_go_offline).
+    """
+
+    def __init__(self, timeout: float = 10) -> None:
+        """
+        :param timeout: timeout of one request in seconds.
+        """
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self) -> 'requests.Session':
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        import requests
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, data=data, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise NetworkError(f'{type(e).__name__}: {e}') from e
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        return Response(response.status_code, headers, response.content, time.monotonic() - started)
+
+    def get(self, url: str) -> Response:
+        return self.request('GET', url)
+
+    def post(self, url: str, data: dict) -> Response:
+        return self.request('POST', url, data)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+        self._session = None
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from array import array
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .CSGOMarketAPI import *
+from .Item import *
+from .RateLimiter import *
+from .Scheduler import *
+from .types import *
+
+__all__ = ['PriceChange', 'WatchlistMonitor']
+
+ItemKey = Tuple[int, int]
+
+# значения в таблице цен: предмет еще не опрашивался / предложений нет
+NOT_POLLED = -2
+NO_OFFERS = -1
+
+
+class PriceChange(NamedTuple):
+    """Изменение лучших цен предмета, цены в копейках, None — предложений нет."""
+    class_id: int
+    instance_id: int
+    old_ask: Optional[int]
+    ask: Optional[int]
+    old_bid: Optional[int]
+    bid: Optional[int]
+
+
+PriceChangeCallback = Callable[[PriceChange], Union[None, Awaitable[None]]]
+
+
+def _price(value: int) -> Optional[int]:
+    return value if value >= 0 else None
+
+
+class WatchlistMonitor:
+    """
+    Мониторинг лучших цен продажи (ask) и покупки (bid) большого списка предметов.
+
+    Цены запрашиваются через MassInfo пачками по 100 предметов, пачки опрашиваются
+    по очереди равномерно в течение `interval`, поэтому расход запросов не скачет.
+    Цены хранятся в компактной таблице из двух массивов, подписчики получают событие,
+    только если цена сдвинулась больше чем на `threshold`.
+    """
+
+    def __init__(self, api, items: MassInfoListType, interval: float = 60, threshold: float = 0.01) -> None:
+        """
+        :param api: CSGOMarketAPI or CSGOMarketPool.
+        :param items: list[dict{class_id: int, instance_id: int}].
+        :param interval: time to poll the whole watchlist in seconds.
+        :param threshold: relative price change for event, 0.01 is 1%.
+        """
+        self.api = api
+        self.interval = interval
+        self.threshold = threshold
+        self.keys: List[ItemKey] = []
+        self.index: Dict[ItemKey, int] = {}
+        for item in items:
+            key = (int(item['class_id']), int(item['instance_id']))
+            if key not in self.index:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+        self.asks = array('q', [NOT_POLLED]) * len(self.keys)
+        self.bids = array('q', [NOT_POLLED]) * len(self.keys)
+        self.callbacks: List[PriceChangeCallback] = []
+        self._next_batch = 0
+        self.polls = 0
+        self.changes = 0
+
+    @property
+    def batches(self) -> int:
+        limit = CSGOMarketAPI.MASS_INFO_LIMIT
+        return max(1, (len(self.keys) + limit - 1) // limit)
+
+    def get(self, item: Item or ImportItemType) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Последние известные цены предмета.
+
+        :return: (ask, bid) in kopecks, None if unknown, not in watchlist or there are no offers.
+        """
+        if isinstance(item, Item):
+            key = (item.class_id, item.instance_id)
+        else:
+            key = (int(item['class_id']), int(item['instance_id']))
+        row = self.index.get(key)
+        if row is None:
+            return None, None
+        return _price(self.asks[row]), _price(self.bids[row])
+
+    def subscribe(self, callback: PriceChangeCallback) -> PriceChangeCallback:
+        """
+        Подписывает функцию на изменения цен.
+
+        :param callback: function or coroutine function with PriceChange argument.
+        :return: callback.
+        """
+        self.callbacks.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: PriceChangeCallback) -> None:
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    def _moved(self, old: int, new: int) -> bool:
+        if old == NOT_POLLED or old == new:
+            return False
+        if old < 0 or new < 0:
+            return True
+        return abs(new - old) > old * self.threshold
+
+    def update(self, items: List[Item]) -> List[PriceChange]:
+        """
+        Записывает цены из результата mass_info(sell=2, buy=2).
+
+        :return: changes beyond threshold.
+        """
+        changes = []
+        asks, bids, index = self.asks, self.bids, self.index
+        for item in items:
+            row = index.get((item.class_id, item.instance_id))
+            if row is None:
+                continue
+            ask, bid = item.best_sell_price, item.best_buy_price
+            ask = ask if ask is not None else NO_OFFERS
+            bid = bid if bid is not None else NO_OFFERS
+            old_ask, old_bid = asks[row], bids[row]
+            if self._moved(old_ask, ask) or self._moved(old_bid, bid):
+                changes.append(PriceChange(item.class_id, item.instance_id, _price(old_ask), _price(ask),
+                                           _price(old_bid), _price(bid)))
+            asks[row], bids[row] = ask, bid
+        return changes
+
+    async def poll_batch(self) -> List[PriceChange]:
+        """
+        Опрашивает следующую пачку списка по кругу.
+
+        :return: changes beyond threshold.
+        """
+        limit = CSGOMarketAPI.MASS_INFO_LIMIT
+        start = self._next_batch * limit
+        self._next_batch = (self._next_batch + 1) % self.batches
+        batch = [{'class_id': key[0], 'instance_id': key[1]} for key in self.keys[start:start + limit]]
+        if not batch:
+            return []
+        changes = self.update(await self.api.mass_info(batch, sell=2, buy=2, info=0))
+        self.polls += 1
+        self.changes += len(changes)
+        for change in changes:
+            await self._publish(change)
+        return changes
+
+    async def _publish(self, change: PriceChange) -> None:
+        for callback in list(self.callbacks):
+            try:
+                result = callback(change)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logging.error('Watchlist subscriber %r failed: %s', callback, e)
+
+    def schedule(self, scheduler: Scheduler, name: str = 'watchlist') -> Job:
+        """
+        Добавляет опрос в планировщик: одна пачка каждые interval / batches секунд.
+
+        :return: Job.
+        """
+        return scheduler.add(name, self.poll_batch, self.interval / self.batches, priority=Priority.BULK)
+
+    def stats(self) -> dict:
+        return {'items': len(self.keys), 'batches': self.batches, 'polls': self.polls, 'changes': self.changes}
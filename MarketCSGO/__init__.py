@@ -1,6 +1,127 @@
-from .CSGOMarketAPI import *
-from .Exceptions import *
-from .Item import *
-from .types import *
+"""
+Клиент API market.csgo.com.
 
-__all__ = ['Item', 'CSGOMarketAPI', 'Exceptions', 'types']
+Модули пакета загружаются лениво, при первом обращении к их именам:
+``from MarketCSGO import Item`` не импортирует клиент, транспорты и asyncio.
+"""
+import importlib
+import sys
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .CSGOMarketAPI import *
+    from .Cache import *
+    from .Config import *
+    from .Exceptions import *
+    from .Item import *
+    from .ItemDB import *
+    from .ItemStore import *
+    from .Ledger import *
+    from .Metrics import *
+    from .OrderBook import *
+    from .Pool import *
+    from .PriceHistory import *
+    from .RateLimiter import *
+    from .Replay import *
+    from .Resilience import *
+    from .Scheduler import *
+    from .TradeFeed import *
+    from .Transport import *
+    from .Watchlist import *
+    from .types import *
+
+__all__ = ['Item', 'CSGOMarketAPI', 'Cache', 'Config', 'Exceptions', 'ItemDB', 'ItemStore', 'Ledger', 'Metrics',
+           'OrderBook', 'Pool', 'PriceHistory', 'RateLimiter', 'Replay', 'Resilience', 'Scheduler', 'TradeFeed',
+           'Transport', 'Watchlist', 'types']
+
+# имя -> модуль, должно совпадать с __all__ модулей (проверяется benchmarks.bench_import)
+_EXPORTS = {
+    'CSGOMarketAPI': 'CSGOMarketAPI',
+    'ResponseCache': 'Cache',
+    'ConfigDiff': 'Config',
+    'ConfigWatcher': 'Config',
+    'Error': 'Exceptions',
+    'BadGatewayError': 'Exceptions',
+    'WrongResponseException': 'Exceptions',
+    'BadAPIKeyException': 'Exceptions',
+    'InsufficientFundsException': 'Exceptions',
+    'UnknownError': 'Exceptions',
+    'NetworkError': 'Exceptions',
+    'ShutdownError': 'Exceptions',
+    'Item': 'Item',
+    'ItemDB': 'ItemDB',
+    'ItemDBRecord': 'ItemDB',
+    'ItemStore': 'ItemStore',
+    'BalanceLedger': 'Ledger',
+    'Histogram': 'Metrics',
+    'EndpointMetrics': 'Metrics',
+    'Metrics': 'Metrics',
+    'RequestHook': 'Metrics',
+    'SlowRequestHook': 'Metrics',
+    'BaseExporter': 'Metrics',
+    'PrometheusExporter': 'Metrics',
+    'LogExporter': 'Metrics',
+    'OrderBook': 'OrderBook',
+    'OrderDiff': 'OrderBook',
+    'CSGOMarketPool': 'Pool',
+    'PriceHistory': 'PriceHistory',
+    'PriceSeries': 'PriceHistory',
+    'Priority': 'RateLimiter',
+    'RateLimiter': 'RateLimiter',
+    'RecordingTransport': 'Replay',
+    'ReplayTransport': 'Replay',
+    'ReplayMissError': 'Replay',
+    'read_records': 'Replay',
+    'RetryPolicy': 'Resilience',
+    'CircuitBreaker': 'Resilience',
+    'NO_RETRY': 'Resilience',
+    'DEFAULT_RETRY_POLICIES': 'Resilience',
+    'Job': 'Scheduler',
+    'Scheduler': 'Scheduler',
+    'Trade': 'TradeFeed',
+    'TradeFeed': 'TradeFeed',
+    'TradeStream': 'TradeFeed',
+    'Response': 'Transport',
+    'BaseTransport': 'Transport',
+    'AiohttpTransport': 'Transport',
+    'SyncTransport': 'Transport',
+    'PriceChange': 'Watchlist',
+    'WatchlistMonitor': 'Watchlist',
+    'ImportItemType': 'types',
+    'MassInfoListType': 'types',
+    'OrderResult': 'types',
+    'ShutdownReport': 'types',
+}
+
+_MODULES = ('CSGOMarketAPI', 'Cache', 'Config', 'Decoder', 'Exceptions', 'Item', 'ItemDB', 'ItemStore', 'Ledger',
+            'Metrics', 'OrderBook', 'Pool', 'PriceHistory', 'RateLimiter', 'Replay', 'Resilience', 'Scheduler',
+            'Simulator', 'TradeFeed', 'Transport', 'Watchlist', 'types')
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    elif name in _MODULES:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_MODULES))
+
+
+class _Package(ModuleType):
+    def __setattr__(self, name: str, value) -> None:
+        # импорт подмодуля записывает его в атрибут пакета; у модулей Item, Scheduler и других
+        # то же имя, что у их классов, и атрибут пакета должен оставаться классом
+        if name in _EXPORTS and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -1,6 +1,9 @@
-from typing import List, TypedDict
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple, TypedDict
 
-__all__ = ['ImportItemType', 'MassInfoListType']
+if TYPE_CHECKING:
+    from .Item import Item
+
+__all__ = ['ImportItemType', 'MassInfoListType', 'OrderResult', 'ShutdownReport']
 
 
 class ImportItemType(TypedDict):
@@ -10,3 +13,19 @@ class ImportItemType(TypedDict):
 
 
 MassInfoListType = List[ImportItemType]
+
+
+class OrderResult(NamedTuple):
+    """Результат одной операции пакетного изменения ордеров."""
+    item: 'Item'
+    price: int
+    success: bool
+    error: Optional[Exception] = None
+
+
+class ShutdownReport(NamedTuple):
+    """Итог завершения работы клиента."""
+    offline: bool
+    cancelled: Dict[str, int]
+    aborted_orders: List[Tuple['Item', int]]
+    elapsed: float
@@ -0,0 +1,174 @@
+"""
+Бенчмарки CSGOMarketAPI на локальном стенде MarketSimulator.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_client --rate 50 --items 2000 --orders 2000
+
+Для каждого сценария печатается пропускная способность, p50/p99 длительности
+операции и эффективность лимитера (доля использованного бюджета запросов).
+`rate_limited` больше нуля означает, что клиент превысил лимит стенда.
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+from MarketCSGO import CSGOMarketAPI, Item, OrderBook, RateLimiter
+from MarketCSGO.Simulator import MarketSimulator
+from .common import Timer, report
+
+KEY = 'bench'
+
+
+def make_client(args: argparse.Namespace) -> (CSGOMarketAPI, MarketSimulator):
+    simulator = MarketSimulator(latency=args.latency, jitter=args.jitter, max_requests=args.rate, seed=1)
+    bot = CSGOMarketAPI(KEY, simulator)
+    bot.MAX_REQUESTS = args.rate
+    bot.limiter = RateLimiter(args.rate)
+    bot.balance = 10 ** 12
+    return bot, simulator
+
+
+def watchlist(size: int) -> list:
+    return [{'class_id': 1000 + i, 'instance_id': 0} for i in range(size)]
+
+
+async def bench_mass_info(args: argparse.Namespace) -> None:
+    bot, simulator = make_client(args)
+    items = watchlist(args.items)
+    timer = Timer()
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        with timer:
+            result = await bot.mass_info(items, sell=2, buy=2)
+        assert len(result) == len(items)
+    report('mass_info', timer, simulator.requests, time.perf_counter() - started, args.rate,
+           items=len(items), rate_limited=simulator.rate_limited)
+
+
+def prepare_orders(args: argparse.Namespace, simulator: MarketSimulator) -> OrderBook:
+    """Заполняет стенд ордерами и возвращает OrderBook с тем же желаемым состоянием."""
+    book = OrderBook()
+    orders = simulator.orders.setdefault(KEY, {})
+    for raw in watchlist(args.orders):
+        price = MarketSimulator.base_price(raw['class_id'], raw['instance_id'])
+        orders[(raw['class_id'], raw['instance_id'])] = price
+        info = simulator.item_info(raw['class_id'], raw['instance_id'])
+        book.set(Item(raw['class_id'], raw['instance_id'], info['market_name'], info['market_hash_name'],
+                      info['hash']), price)
+    return book
+
+
+def reprice(book: OrderBook, changes: int, rng: random.Random) -> None:
+    for item, price in rng.sample(list(book.desired.values()), changes):
+        book.set(item, price + rng.randint(1, 10))
+
+
+async def bench_reconcile(args: argparse.Namespace) -> None:
+    bot, simulator = make_client(args)
+    book = prepare_orders(args, simulator)
+    rng = random.Random(1)
+    orders = await bot.get_orders()
+    timer = Timer()
+    for _ in range(args.repeat):
+        with timer:
+            book.diff(orders)
+    report('reconcile_diff', timer, 0, sum(timer.samples), args.rate, orders=len(orders))
+
+    timer = Timer()
+    requests = simulator.requests
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        reprice(book, args.changes, rng)
+        with timer:
+            await book.sync(bot)
+    report('reconcile_sync', timer, simulator.requests - requests, time.perf_counter() - started, args.rate,
+           orders=args.orders, changes=args.changes, rate_limited=simulator.rate_limited)
+
+
+def load_main(directory: str, delay: int, orders: int):
+    """
+    Импортирует main.py с временным config.py: main ищет его по sys.path, как при запуске.
+
+    :param directory: directory for config.py.
+    :param delay: MAIN_LOOP_DELAY in milliseconds.
+    :param orders: number of purchased items, the same as in :func:`prepare_orders`.
+    """
+    items = [{**raw, 'price': MarketSimulator.base_price(raw['class_id'], raw['instance_id'])}
+             for raw in watchlist(orders)]
+    with open(os.path.join(directory, 'config.py'), 'w') as file:
+        file.write(f'API_KEY = {KEY!r}\nDEBUG = False\nMAIN_LOOP_DELAY = {delay}\nITEMS_PURCHASE = {items!r}\n')
+    sys.path.insert(0, directory)
+    try:
+        return importlib.import_module('main')
+    finally:
+        sys.path.remove(directory)
+
+
+async def bench_main_loop(args: argparse.Namespace) -> None:
+    """
+    Настоящий main.main_loop под фоновой нагрузкой MassInfo.
+
+    Ордера на стенде выставлены заранее, каждая итерация снимает `changes` из них, как будто
+    предметы куплены, и измеряет время, за которое цикл их восстановит.
+    """
+    bot, simulator = make_client(args)
+    simulator.initial_balance = bot.balance
+    prepare_orders(args, simulator)
+    orders = simulator.orders[KEY]
+    expected = dict(orders)
+    rng = random.Random(2)
+    items = watchlist(args.items)
+
+    async def background() -> None:
+        while True:
+            await bot.mass_info(items, sell=2, buy=2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        main = load_main(directory, args.delay, args.orders)
+        loop = asyncio.ensure_future(main.main_loop(bot))
+        load = asyncio.ensure_future(background())
+        timer = Timer()
+        requests = simulator.requests
+        started = time.perf_counter()
+        try:
+            for _ in range(args.repeat):
+                for key in rng.sample(list(expected), args.changes):
+                    del orders[key]
+                with timer:
+                    while orders != expected:
+                        await asyncio.sleep(0.01)
+        finally:
+            load.cancel()
+            loop.cancel()
+            shutdown = await loop
+    report('main_loop_repair', timer, simulator.requests - requests, time.perf_counter() - started, args.rate,
+           background_items=len(items), rate_limited=simulator.rate_limited,
+           avg_wait=f'{bot.limiter.stats()["avg_wait"] * 1000:.1f}ms',
+           shutdown=f'{shutdown.elapsed * 1000:.0f}ms', offline=shutdown.offline)
+
+
+async def main(args: argparse.Namespace) -> None:
+    await bench_mass_info(args)
+    await bench_reconcile(args)
+    await bench_main_loop(args)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=int, default=50, help='requests per second allowed by limiter and simulator')
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated response latency, s')
+    parser.add_argument('--jitter', type=float, default=0.01, help='max random addition to latency, s')
+    parser.add_argument('--items', type=int, default=2000, help='items in mass_info list')
+    parser.add_argument('--orders', type=int, default=2000, help='orders for reconciliation')
+    parser.add_argument('--changes', type=int, default=20, help='repriced orders per tick')
+    parser.add_argument('--delay', type=int, default=500, help='MAIN_LOOP_DELAY of main_loop scenario, ms')
+    parser.add_argument('--repeat', type=int, default=5, help='iterations of each scenario')
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""
+Бенчмарк времени импорта пакета MarketCSGO.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_import --repeat 10
+
+Каждый сценарий импортируется в новом процессе интерпретатора, печатается медиана
+и p99 времени импорта. Скрипт завершается с ошибкой, если сценарий вышел за бюджет,
+если при импорте загрузились тяжелые зависимости, которые должны грузиться лениво,
+или если таблица ленивых имен в MarketCSGO/__init__.py разошлась с __all__ модулей.
+"""
+import argparse
+import ast
+import importlib
+import subprocess
+import sys
+
+from .common import percentile
+
+CHILD = '''
+import sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(elapsed)
+print(sorted(sys.modules))
+'''
+
+# (statement, budget in ms, modules which must not be imported)
+SCENARIOS = [
+    ('import MarketCSGO', 5, ('asyncio', 'aiohttp', 'requests', 'sqlite3')),
+    ('from MarketCSGO import Item', 5, ('asyncio', 'aiohttp', 'requests', 'sqlite3')),
+    ('from MarketCSGO.types import ImportItemType', 10, ('asyncio', 'aiohttp', 'requests', 'sqlite3')),
+    ('from MarketCSGO import CSGOMarketAPI', 150, ('aiohttp', 'requests', 'orjson', 'simdjson')),
+    ('from MarketCSGO import *', 150, ('aiohttp', 'requests')),
+]
+
+
+def run(statement: str) -> (float, list):
+    output = subprocess.run([sys.executable, '-c', CHILD.format(statement=statement)],
+                            check=True, capture_output=True, text=True).stdout.splitlines()
+    return float(output[0]), ast.literal_eval(output[1])
+
+
+def check_exports() -> list:
+    """Сверяет ленивую таблицу имен пакета с __all__ модулей."""
+    package = importlib.import_module('MarketCSGO')
+    errors = []
+    declared = {}
+    for name, module in package._EXPORTS.items():
+        declared.setdefault(module, set()).add(name)
+    for module in set(package._MODULES) - {'Decoder', 'Simulator'}:
+        exported = set(importlib.import_module(f'MarketCSGO.{module}').__all__)
+        if exported != declared.get(module, set()):
+            errors.append(f'{module}: __all__ {sorted(exported)} != _EXPORTS {sorted(declared.get(module, ()))}')
+    return errors
+
+
+def main(args: argparse.Namespace) -> int:
+    errors = check_exports()
+    for statement, budget, forbidden in SCENARIOS:
+        samples, modules = [], []
+        for _ in range(args.repeat):
+            elapsed, modules = run(statement)
+            samples.append(elapsed)
+        median = percentile(samples, 50) * 1000
+        loaded = [name for name in forbidden if name in modules]
+        print(f'{statement:<48} p50={median:.1f}ms p99={percentile(samples, 99) * 1000:.1f}ms '
+              f'budget={budget}ms modules={len(modules)}' + (f' eager={",".join(loaded)}' if loaded else ''))
+        if median > budget * args.budget_scale:
+            errors.append(f'{statement!r}: {median:.1f} ms exceeds budget {budget * args.budget_scale:.0f} ms')
+        if loaded:
+            errors.append(f'{statement!r} imported {", ".join(loaded)}')
+    for error in errors:
+        print(f'FAIL {error}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='fresh interpreter runs per scenario')
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='multiplier of budgets for slow machines')
+    sys.exit(main(parser.parse_args()))
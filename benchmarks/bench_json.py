@@ -0,0 +1,86 @@
+"""
+Бенчмарк разбора ответов API: исходный путь через json.loads против MarketCSGO.Decoder.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_json --repeat 200
+
+Сравниваются полный разбор стандартным json, полный разбор выбранным декодером
+(orjson, simdjson или json, смотря что установлено) и выборочный разбор полей,
+которые реально нужны вызывающему коду.
+"""
+import argparse
+import json
+import random
+import time
+
+from MarketCSGO.Decoder import json_backend, loads, loads_fields
+from .common import Timer, percentile
+
+
+def mass_info_payload(rng: random.Random) -> bytes:
+    """MassInfo на 100 предметов с history=1 и info=3."""
+    results = []
+    for i in range(100):
+        price = rng.randint(100, 100000)
+        results.append({
+            'classid': str(1000 + i), 'instanceid': '0',
+            'sell_offers': {'best_offer': price, 'offers': [[price + j, 1, 0] for j in range(50)]},
+            'buy_offers': {'best_offer': price - 10, 'offers': [[price - 10 - j, 1, 0] for j in range(50)]},
+            'history': {'max': price, 'min': price, 'average': price, 'number': 100,
+                        'history': [[1600000000 - j * 60, price + j % 7] for j in range(100)]},
+            'info': {'market_name': f'Предмет {i}', 'market_hash_name': f'Item {i}', 'hash': f'{i:032x}',
+                     'description': [{'type': 'html', 'value': 'Описание ' * 20}] * 5,
+                     'tags': [{'internal_name': f'tag{j}', 'name': f'Тег {j}', 'category': 'Type'}
+                              for j in range(8)],
+                     'our_market_instanceid': None},
+        })
+    return json.dumps({'success': True, 'results': results}).encode()
+
+
+def item_history_payload(rng: random.Random) -> bytes:
+    """ItemHistory с 500 сделками."""
+    history = [{'l_price': str(rng.randint(100, 200)), 'l_time': str(1600000000 - i * 60)} for i in range(500)]
+    return json.dumps({'success': True, 'max': 200, 'min': 100, 'average': 150, 'number': 500,
+                       'history': history}).encode()
+
+
+def measure(func, payload: bytes, repeat: int) -> Timer:
+    timer = Timer()
+    for _ in range(repeat):
+        with timer:
+            func(payload)
+    return timer
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(1)
+    cases = [
+        ('MassInfo', mass_info_payload(rng), ('success', 'results')),
+        ('MassInfo.success', mass_info_payload(rng), ('success',)),
+        ('ItemHistory', item_history_payload(rng), ('success', 'history')),
+        ('ItemHistory.average', item_history_payload(rng), ('success', 'average')),
+        ('GetMoney', b'{"money":123456,"currency":"RUB"}', ('money',)),
+    ]
+    print(f'backend={json_backend()}')
+    for name, payload, fields in cases:
+        variants = [
+            ('json.loads', json.loads),
+            ('loads', loads),
+            ('loads_fields', lambda content: loads_fields(content, ('error', *fields))),
+        ]
+        baseline = None
+        for variant, func in variants:
+            started = time.perf_counter()
+            timer = measure(func, payload, args.repeat)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f'{name:<22} {variant:<13} size={len(payload)} '
+                  f'p50={percentile(timer.samples, 50) * 1e6:.1f}us p99={percentile(timer.samples, 99) * 1e6:.1f}us '
+                  f'speedup={baseline / elapsed:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help='decodes of each payload')
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+"""
+Бенчмарк разбора больших ответов MassInfo в цикле событий и в executor клиента.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_offload --repeat 20
+
+Клиент запрашивает mass_info на `batches` пачек сразу, на каждую пачку транспорт без сети
+отвечает MassInfo на 100 предметов (около 1 МБ). Параллельно задача-тикер спит по 1 мс
+и замеряет, насколько цикл событий опаздывает ее разбудить. Печатается общее время
+mass_info и задержка цикла: p99 и максимум.
+"""
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from MarketCSGO.CSGOMarketAPI import CSGOMarketAPI
+from MarketCSGO.Decoder import decode, json_backend
+from MarketCSGO.RateLimiter import RateLimiter
+from MarketCSGO.Transport import BaseTransport, Response
+from .bench_json import mass_info_payload
+from .common import percentile
+
+TICK = 0.001
+
+
+class PayloadTransport(BaseTransport):
+    """Отвечает одним и тем же телом на любой запрос."""
+
+    def __init__(self, payload: bytes) -> None:
+        self.payload = payload
+
+    async def request(self, method: str, url: str, data: Optional[dict] = None) -> Response:
+        return Response(200, {'content-type': 'application/json'}, self.payload)
+
+
+async def ticker(lags: list) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def run(executor, payload: bytes, repeat: int, batches: int) -> (float, list):
+    api = CSGOMarketAPI('key', PayloadTransport(payload), executor=executor)
+    api.limiter = RateLimiter(1000)
+    items = [{'class_id': 1000 + i, 'instance_id': 0} for i in range(CSGOMarketAPI.MASS_INFO_LIMIT)] * batches
+    if executor is not None:
+        # запуск процессов пула не входит в замер
+        await asyncio.get_running_loop().run_in_executor(executor, decode, b'{}')
+    lags = []
+    task = asyncio.ensure_future(ticker(lags))
+    await asyncio.sleep(10 * TICK)
+    lags.clear()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await api.mass_info(items, sell=1, buy=1, history=1, info=3)
+    elapsed = time.perf_counter() - started
+    task.cancel()
+    await api.close()
+    return elapsed, lags
+
+
+async def main(args: argparse.Namespace) -> None:
+    payload = mass_info_payload(random.Random(1))
+    print(f'backend={json_backend()} size={len(payload)}')
+    variants = [
+        ('inline', None),
+        ('thread', ThreadPoolExecutor(args.workers)),
+        ('process', ProcessPoolExecutor(args.workers)),
+    ]
+    for name, executor in variants:
+        elapsed, lags = await run(executor, payload, args.repeat, args.batches)
+        print(f'{name:<8} total={elapsed * 1000:.0f}ms per_call={elapsed / args.repeat * 1000:.1f}ms '
+              f'lag_p99={percentile(lags, 99) * 1000:.1f}ms lag_max={max(lags, default=0) * 1000:.1f}ms')
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='mass_info calls per variant')
+    parser.add_argument('--batches', type=int, default=10, help='concurrent MassInfo requests in one mass_info call')
+    parser.add_argument('--workers', type=int, default=1, help='executor workers')
+    asyncio.run(main(parser.parse_args()))
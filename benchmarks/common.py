@@ -0,0 +1,55 @@
+import time
+from typing import List
+
+__all__ = ['percentile', 'Timer', 'report']
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией, q в диапазоне [0, 100]."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class Timer:
+    """Собирает длительности операций."""
+
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+
+    def __enter__(self) -> 'Timer':
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.samples.append(time.perf_counter() - self._started)
+
+
+def report(name: str, timer: Timer, requests: int, elapsed: float, rate: float, **extra) -> None:
+    """
+    Печатает строку результата бенчмарка.
+
+    :param name: benchmark name.
+    :param timer: collected latencies of operations.
+    :param requests: number of HTTP requests sent.
+    :param elapsed: total time in seconds.
+    :param rate: allowed requests per second, used for limiter efficiency.
+    """
+    throughput = requests / elapsed if elapsed else 0.0
+    # окно лимитера целиком свободно в начале прогона, поэтому за elapsed секунд доступно rate * (elapsed + 1) слотов
+    efficiency = requests / (rate * (elapsed + 1)) if rate else 0.0
+    fields = [
+        f'{name:<24}',
+        f'ops={len(timer.samples)}',
+        f'req={requests}',
+        f'req/s={throughput:.2f}',
+        f'p50={percentile(timer.samples, 50) * 1000:.1f}ms',
+        f'p99={percentile(timer.samples, 99) * 1000:.1f}ms',
+        f'limiter_efficiency={efficiency:.1%}',
+    ]
+    fields += [f'{key}={value}' for key, value in extra.items()]
+    print(' '.join(fields))
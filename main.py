@@ -1,9 +1,14 @@
+import argparse
 import asyncio
 import contextlib
 import logging
-from asyncio import shield, CancelledError
+from asyncio import CancelledError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-from MarketCSGO import CSGOMarketAPI
+from MarketCSGO import AiohttpTransport, CSGOMarketAPI, ConfigWatcher, ItemStore, LogExporter, OrderBook, Priority, \
+    RecordingTransport, ReplayTransport, Scheduler, ShutdownReport
+import config
 from config import *
 
 if DEBUG:
@@ -14,49 +19,103 @@ else:
     #                     level=logging.INFO)
 
 
-async def main_loop(bot: CSGOMarketAPI) -> None:
+async def sync_orders(bot: CSGOMarketAPI, book: OrderBook) -> bool:
+    """
+    Сверка ордеров с желаемым состоянием.
+
+    :return: True, если пришлось изменить ордера.
+    """
+    diff = await book.sync(bot)
+    if diff:
+        logging.info(f'Свободный баланс: {bot.ledger.available / 100} ₽')
+    return bool(diff)
+
+
+async def reload_config(bot: CSGOMarketAPI, book: OrderBook, watcher: ConfigWatcher, scheduler: Scheduler) -> None:
+    """Перечитывает config.py, если он изменился: список закупки и интервал сверки."""
+    diff = await watcher.reload(bot, book)
+    if diff.delay is not None:
+        scheduler.set_interval('orders', diff.delay, min_interval=diff.delay, max_interval=diff.delay * 6)
+    if diff:
+        scheduler.trigger('orders')
+
+
+async def export_metrics(bot: CSGOMarketAPI) -> None:
+    """Сводка метрик запросов в лог."""
+    bot.metrics.export()
+
+
+async def main_loop(bot: CSGOMarketAPI) -> Optional[ShutdownReport]:
     """
     Главный loop
 
+    Ошибки запуска пробрасываются после выхода из онлайна и остановки планировщика.
+
     :param bot: CSGOMarketAPI
-    :return: None
+    :return: ShutdownReport if loop was cancelled.
     """
-    exit_ = False
-    if bot.balance < 0:
-        await bot.get_money()
-    logging.info(f'Баланс: {bot.balance}')
-    items_to_purchase = [{'item': item, 'price': _['price']} for item, _ in
-                         zip(await bot.mass_info(ITEMS_PURCHASE), ITEMS_PURCHASE)]
-    while True:
-        if exit_:
-            break
-        try:
-            await shield(asyncio.sleep(MAIN_LOOP_DELAY / 1000))
-        except CancelledError:
-            return
-        orders = await bot.get_orders()
-        logging.debug('-----orders-----')
-        logging.debug(orders)
-        logging.debug('----orders-END----')
-        for _ in items_to_purchase:
-            item, price = _['item'], _['price']
-            matches = [
-                i for i in orders if
-                int(i["i_classid"]) == item.class_id and int(i['i_instanceid']) == item.instance_id]
-            if not matches:
-                await bot.insert_order(item, price)
-                logging.info(f'Предмет "{item.market_name}". Выставление нового лота.')
-                logging.info(f'Текущий баланс: {bot.balance / 100} ₽')
+    scheduler = Scheduler(bot.limiter)
+    scheduler.add('ping_pong', bot.ping_pong, 3 * 60 - 5, priority=Priority.CRITICAL, deadline=3 * 60 - 5)
+    runner = asyncio.ensure_future(scheduler.run())
+    try:
+        if bot.item_store is not None:
+            await bot.item_store.refresh(bot)
+        if bot.balance < 0:
+            await bot.get_money()
+        logging.info(f'Баланс: {bot.balance}')
+        book = OrderBook()
+        # config.py ищется по sys.path, как при импорте, а не в текущей директории
+        watcher = ConfigWatcher(config.__file__)
+        await watcher.reload(bot, book, force=True)
+        delay = watcher.delay
+        scheduler.add('orders', lambda: sync_orders(bot, book), delay,
+                      adaptive=True, min_interval=delay, max_interval=delay * 6)
+        scheduler.add('config', lambda: reload_config(bot, book, watcher, scheduler), 5)
+        scheduler.add('balance', bot.refresh_balance, 30)
+        if bot.item_store is not None:
+            # база предметов обновляется и во время работы, не только между перезапусками
+            scheduler.add('item_store', lambda: bot.item_store.refresh(bot), 30 * 60, delay=30 * 60)
+        bot.metrics.add_exporter(LogExporter())
+        scheduler.add('metrics', lambda: export_metrics(bot), 5 * 60)
+        # shield: отмена main_loop не должна сразу отменять планировщик вместе с задачей сверки
+        await asyncio.shield(runner)
+    except CancelledError:
+        pass
+    finally:
+        # и при отмене, и при ошибке запуска (ключ, конфиг, сеть): сначала выход из онлайна
+        # и снятие очереди, затем остановка задач, так отброшенные изменения ордеров
+        # попадут в отчет, а не потеряются при отмене задачи сверки
+        report = await bot.shutdown()
+        runner.cancel()
+        with contextlib.suppress(CancelledError):
+            await runner
+    return report
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Автоматическое выставление ордеров на market.csgo.com')
+    parser.add_argument('--record', metavar='FILE', help='записывать запросы и ответы API в файл')
+    parser.add_argument('--replay', metavar='FILE', help='воспроизвести записанную сессию без сети')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='множитель записанных задержек при воспроизведении, 0 — без задержек')
+    args = parser.parse_args()
+
     logging.info('----- Init -----')
-    bot = CSGOMarketAPI(API_KEY)
+    if args.replay:
+        transport = ReplayTransport(args.replay, args.latency_scale)
+    elif args.record:
+        transport = RecordingTransport(AiohttpTransport(), args.record)
+    else:
+        transport = None
+    # хранилище предметов наполняется ответами MassInfo: при записи оно убрало бы их из сессии,
+    # а при воспроизведении подмешало бы предметы и проверки, которых в записи нет
+    item_store = ItemStore('items.sqlite3') if not (args.replay or args.record) else None
+    # большие ответы MassInfo разбираются в отдельном потоке, чтобы не задерживать пинги и ордера
+    bot = CSGOMarketAPI(API_KEY, transport, item_store=item_store,
+                        executor=ThreadPoolExecutor(2, thread_name_prefix='decode'))
     loop = asyncio.get_event_loop()
 
     tasks = asyncio.gather(
-        bot.refresh_request_counter_loop(),
-        bot.stay_online_loop(),
         main_loop(bot), return_exceptions=True
     )
 
@@ -71,6 +130,10 @@ def main():
         loop.run_until_complete(loop.shutdown_asyncgens())
         logging.info('Bay!')
     finally:
+        loop.run_until_complete(bot.close())
+        if bot.item_store is not None:
+            bot.item_store.close()
+        bot.executor.shutdown()
         loop.close()
         exit()
 
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Optional
+
+from MarketCSGO.CSGOMarketAPI import CSGOMarketAPI
+from MarketCSGO.RateLimiter import RateLimiter
+from MarketCSGO.Simulator import MarketSimulator
+from MarketCSGO.Transport import Response
+
+__all__ = ['KEY', 'make_client', 'SyncSimulator']
+
+KEY = 'test'
+
+
+def make_client(simulator: Optional[MarketSimulator] = None, rate: int = 50) -> CSGOMarketAPI:
+    """
+    Клиент на локальном стенде без сети.
+
+    :param simulator: transport, by default MarketSimulator without latency.
+    :param rate: requests per second allowed by client limiter and simulator.
+    """
+    if simulator is None:
+        simulator = MarketSimulator(latency=0, max_requests=rate, seed=1)
+    bot = CSGOMarketAPI(KEY, simulator)
+    bot.MAX_REQUESTS = rate
+    bot.limiter = RateLimiter(rate)
+    return bot
+
+
+class SyncSimulator:
+    """Синхронный транспорт поверх MarketSimulator, замена SyncTransport клиента."""
+
+    def __init__(self, simulator: MarketSimulator) -> None:
+        self.simulator = simulator
+
+    def get(self, url: str) -> Response:
+        return asyncio.run(self.simulator.request('GET', url))
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from MarketCSGO.Cache import ResponseCache
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+TTL = 0.05
+
+
+class ResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.cache = ResponseCache(maxsize=2, ttls={'SellOffers': TTL})
+        self.fetched = []
+
+    def fetch(self, key: str, value=None, delay: float = 0):
+        async def fetch():
+            self.fetched.append(key)
+            await asyncio.sleep(delay)
+            return value if value is not None else {'success': True, 'key': key}
+
+        return fetch
+
+    async def get(self, key: str, **kwargs):
+        return await self.cache.get_or_fetch('SellOffers', key, self.fetch(key, **kwargs))
+
+    async def test_concurrent_calls_are_coalesced(self):
+        results = await asyncio.gather(*(self.get('1_0', delay=0.01) for _ in range(5)))
+        self.assertEqual(self.fetched, ['1_0'])
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.cache.stats()['coalesced'], 4)
+
+    async def test_lru_eviction(self):
+        await self.get('1_0')
+        await self.get('2_0')
+        await self.get('1_0')
+        await self.get('3_0')
+        self.assertEqual(len(self.cache), 2)
+        await self.get('1_0')
+        await self.get('2_0')
+        self.assertEqual(self.fetched, ['1_0', '2_0', '3_0', '2_0'])
+
+    async def test_ttl_expiry(self):
+        await self.get('1_0')
+        await self.get('1_0')
+        await asyncio.sleep(TTL * 1.5)
+        await self.get('1_0')
+        self.assertEqual(self.fetched, ['1_0', '1_0'])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    async def test_endpoint_without_ttl_is_not_cached(self):
+        for _ in range(2):
+            await self.cache.get_or_fetch('SellOffers', '1_0', self.fetch('1_0'))
+            await self.cache.get_or_fetch('Unknown', '1_0', self.fetch('1_0'))
+        self.assertEqual(self.fetched, ['1_0', '1_0', '1_0'])
+
+    async def test_invalidate_prefix(self):
+        cache = ResponseCache(ttls={'ItemInfo': TTL * 100})
+        for key in ('1_0/ru', '1_0/en', '1_01/ru', '2_0/ru'):
+            await cache.get_or_fetch('ItemInfo', key, self.fetch(key))
+        cache.invalidate('1_0')
+        self.assertEqual(sorted(key for endpoint, key in cache._data), ['1_01/ru', '2_0/ru'])
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    async def test_failed_response_is_not_cached(self):
+        results = await asyncio.gather(self.get('1_0', value={}, delay=0.01), self.get('1_0'))
+        self.assertEqual(results, [{}, {}])
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(await self.get('1_0'), {'success': True, 'key': '1_0'})
+        self.assertEqual(self.fetched, ['1_0', '1_0'])
+
+    async def test_client_offers(self):
+        bot = make_client(MarketSimulator(latency=0, max_requests=50))
+        bot.cache = ResponseCache()
+        item = {'class_id': 1000, 'instance_id': 0}
+        first, second = await asyncio.gather(bot.sell_offers(item), bot.sell_offers(item))
+        self.assertTrue(first['success'])
+        self.assertIs(first, second)
+        self.assertIs(await bot.sell_offers(item), first)
+        self.assertEqual(bot.cache.stats()['misses'], 1)
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+import unittest
+
+from MarketCSGO.Exceptions import ShutdownError
+from MarketCSGO.RateLimiter import Priority, RateLimiter
+from MarketCSGO.Simulator import MarketSimulator
+from .common import KEY, SyncSimulator, make_client
+
+
+class SyncGoOfflineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = MarketSimulator(latency=0)
+        self.bot = make_client(self.simulator)
+        self.bot.sync_transport = SyncSimulator(self.simulator)
+        self.simulator.online[KEY] = True
+
+    def test_free_limiter(self):
+        self.assertTrue(self.bot.sync_go_offline())
+        self.assertFalse(self.simulator.online[KEY])
+        self.assertEqual(self.bot.limiter.stats()['in_flight'], 0)
+
+    def test_slots_never_released(self):
+        # запросы были в пути, когда остановился event loop: их слоты не освободятся никогда
+        self.bot.limiter = RateLimiter(4, period=0.2)
+        for _ in range(4):
+            self.assertTrue(self.bot.limiter.acquire_nowait(Priority.CRITICAL))
+        started = time.monotonic()
+        self.assertTrue(self.bot.sync_go_offline())
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertFalse(self.simulator.online[KEY])
+        self.assertEqual(self.bot.limiter.stats()['in_flight'], 4)
+
+
+class ShutdownTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_offline_with_slow_requests_in_flight(self):
+        simulator = MarketSimulator(latency=2.0)
+        bot = make_client(simulator, rate=4)
+        simulator.online[KEY] = True
+        batches = [asyncio.ensure_future(bot.mass_info([{'class_id': i, 'instance_id': 0}])) for i in range(4)]
+        await asyncio.sleep(0.1)
+        self.assertEqual(bot.limiter.stats()['in_flight'], 3)
+        report = await bot.shutdown(timeout=5)
+        self.assertTrue(report.offline)
+        self.assertFalse(simulator.online[KEY])
+        self.assertEqual(report.cancelled, {'BULK': 1})
+        self.assertLess(report.elapsed, 3.0)
+        results = await asyncio.gather(*batches, return_exceptions=True)
+        self.assertEqual(sum(isinstance(result, ShutdownError) for result in results), 1)
+        await bot.close()
+
+
+class OffersTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_best_offers_decode_only_price(self):
+        simulator = MarketSimulator(latency=0, max_requests=50)
+        bot = make_client(simulator)
+        item = {'class_id': 1000, 'instance_id': 0}
+        for method in ('BestSellOffer', 'BestBuyOffer'):
+            respond = getattr(simulator, f'_api_{method}')
+            setattr(simulator, f'_api_{method}',
+                    lambda *args, respond=respond: {**respond(*args), 'offers': [{'price': '1'}] * 100})
+        self.assertEqual(set(await bot.best_sell_offer(item)), {'success', 'best_offer'})
+        self.assertEqual(set(await bot.best_buy_offer(item)), {'success', 'best_offer'})
+        self.assertIn('offers', await bot.sell_offers(item))
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from MarketCSGO.Config import ConfigWatcher
+from MarketCSGO.OrderBook import OrderBook
+from .common import make_client
+
+
+class ConfigWatcherTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'config.py')
+        self.bot = make_client()
+        self.book = OrderBook()
+        self.watcher = ConfigWatcher(self.path)
+        self.resolved = []
+        mass_info = self.bot.mass_info
+
+        async def counting_mass_info(items, *args, **kwargs):
+            self.resolved.append(len(items))
+            return await mass_info(items, *args, **kwargs)
+
+        self.bot.mass_info = counting_mass_info
+
+    async def asyncTearDown(self) -> None:
+        await self.bot.close()
+        self.directory.cleanup()
+
+    def write(self, prices: dict, delay: int = 5000) -> None:
+        items = [{'class_id': class_id, 'instance_id': 0, 'price': price} for class_id, price in prices.items()]
+        with open(self.path, 'w') as file:
+            file.write(f'MAIN_LOOP_DELAY = {delay}\nITEMS_PURCHASE = {items!r}\n')
+        # mtime может не измениться в пределах разрешения файловой системы
+        self.watcher._stamp = None
+
+    def desired(self) -> dict:
+        return {key[0]: price for key, (item, price) in self.book.desired.items()}
+
+    async def test_initial_load(self):
+        self.write({1: 100, 2: 200})
+        diff = await self.watcher.reload(self.bot, self.book, force=True)
+        self.assertEqual(diff.added, {(1, 0): 100, (2, 0): 200})
+        self.assertEqual(diff.delay, 5.0)
+        self.assertEqual(self.desired(), {1: 100, 2: 200})
+
+    async def test_unchanged_file_is_not_read(self):
+        self.write({1: 100})
+        await self.watcher.reload(self.bot, self.book, force=True)
+        self.assertFalse(await self.watcher.reload(self.bot, self.book))
+        self.assertEqual(self.resolved, [1])
+
+    async def test_minimal_diff(self):
+        self.write({1: 100, 2: 200, 3: 300})
+        await self.watcher.reload(self.bot, self.book, force=True)
+        self.write({2: 250, 3: 300, 4: 400}, delay=3000)
+        diff = await self.watcher.reload(self.bot, self.book)
+        self.assertEqual(diff.added, {(4, 0): 400})
+        self.assertEqual(diff.removed, [(1, 0)])
+        self.assertEqual(diff.repriced, {(2, 0): 250})
+        self.assertEqual(diff.delay, 3.0)
+        self.assertEqual(self.resolved, [3, 1])
+        self.assertEqual(self.desired(), {2: 250, 3: 300, 4: 400})
+
+    async def test_broken_config_keeps_state(self):
+        self.write({1: 100})
+        await self.watcher.reload(self.bot, self.book, force=True)
+        with open(self.path, 'w') as file:
+            file.write('ITEMS_PURCHASE = [')
+        self.assertFalse(await self.watcher.reload(self.bot, self.book))
+        os.remove(self.path)
+        self.assertFalse(await self.watcher.reload(self.bot, self.book))
+        self.assertEqual(self.watcher.failures, 2)
+        self.assertEqual(self.desired(), {1: 100})
+
+    async def test_missing_config_at_start_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            await self.watcher.reload(self.bot, self.book, force=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from MarketCSGO.Exceptions import NetworkError
+from MarketCSGO.ItemDB import ItemDB
+from MarketCSGO.Simulator import MarketSimulator
+from MarketCSGO.Transport import AiohttpTransport
+from .common import make_client
+
+
+class ItemDBTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.simulator = MarketSimulator(latency=0)
+        self.bot = make_client(self.simulator)
+        self.db = ItemDB(self.directory.name)
+
+    async def asyncTearDown(self) -> None:
+        self.db.close()
+        await self.bot.close()
+        self.directory.cleanup()
+
+    async def test_update_and_lookup(self):
+        self.assertIsNone(self.db.get(1000, 0))
+        self.assertTrue(await self.db.update(self.bot))
+        self.assertEqual(self.db.time, str(self.simulator.db_time))
+        record = self.db.get(1000, 0)
+        info = self.simulator.item_info(1000, 0)
+        self.assertEqual((record.market_name, record.price), (info['market_name'], MarketSimulator.base_price(1000, 0)))
+        self.assertEqual(self.db.find_by_hash_name(info['market_hash_name']), [record])
+        self.assertIsNone(self.db.get(5000, 0))
+
+    async def test_update_only_new_version(self):
+        await self.db.update(self.bot)
+        self.assertFalse(await self.db.update(self.bot))
+        self.assertTrue(await self.db.update(self.bot, force=True))
+        self.simulator.db_time += 3600
+        self.assertTrue(await self.db.update(self.bot))
+        self.assertEqual(self.db.time, str(self.simulator.db_time))
+
+    async def test_failed_download_keeps_index(self):
+        await self.db.update(self.bot)
+        old_time = self.db.time
+
+        async def download(url: str, path: str):
+            raise NetworkError('ClientPayloadError: connection reset')
+
+        self.simulator.download = download
+        self.simulator.db_time += 3600
+        with self.assertRaises(NetworkError):
+            await self.db.update(self.bot)
+        self.assertEqual(self.db.time, old_time)
+        self.assertIsNotNone(self.db.get(1000, 0))
+
+
+class AiohttpDownloadTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        from aiohttp import web
+
+        async def stalled(request):
+            # отдает начало файла и замолкает, загрузка прерывается по таймауту чтения
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await response.write(b'c_classid;c_instanceid\n')
+            await asyncio.sleep(1)
+            return response
+
+        app = web.Application()
+        app.router.add_get('/stalled.csv', stalled)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'current_730.csv')
+        self.transport = AiohttpTransport(timeout=0.2)
+
+    async def asyncTearDown(self) -> None:
+        await self.transport.close()
+        await self.runner.cleanup()
+        self.directory.cleanup()
+
+    async def test_interrupted_download(self):
+        with self.assertRaises(NetworkError):
+            await self.transport.download(f'http://127.0.0.1:{self.port}/stalled.csv', self.path)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    async def test_connection_error(self):
+        await self.runner.cleanup()
+        with self.assertRaises(NetworkError):
+            await self.transport.download(f'http://127.0.0.1:{self.port}/stalled.csv', self.path)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from MarketCSGO.ItemStore import ItemStore
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+ITEMS = [{'class_id': 1000 + i, 'instance_id': 0} for i in range(3)]
+
+
+class ItemStoreTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'items.sqlite3')
+        self.store = ItemStore(self.path)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_levels(self):
+        self.store.put_many({'1_0': {'name': 'full'}}, 3)
+        self.store.put_many({'2_0': {'name': 'base'}}, 1)
+        self.assertEqual(self.store.get_many(['1_0', '2_0'], 1), {'1_0': {'name': 'full'}, '2_0': {'name': 'base'}})
+        self.assertEqual(self.store.get_many(['1_0', '2_0', '3_0'], 2), {'1_0': {'name': 'full'}})
+        self.assertEqual(self.store.stats()['misses'], 2)
+
+    def test_lower_level_does_not_overwrite(self):
+        self.store.put_many({'1_0': {'name': 'full'}}, 3)
+        self.store.put_many({'1_0': {'name': 'base'}}, 1)
+        self.assertEqual(self.store.get_many(['1_0'], 1), {'1_0': {'name': 'full'}})
+        self.store.put_many({'1_0': {'name': 'hash'}}, 3)
+        self.assertEqual(self.store.get_many(['1_0'], 3), {'1_0': {'name': 'hash'}})
+
+    def test_records_survive_restart(self):
+        self.store.validate('1')
+        self.store.put_many({'1_0': {'name': 'item'}}, 2)
+        self.store.close()
+        self.store = ItemStore(self.path)
+        self.assertEqual(self.store.db_time, '1')
+        self.assertEqual(len(self.store), 1)
+
+    def test_validate_drops_records_of_old_db(self):
+        self.assertFalse(self.store.validate('1'))
+        self.store.put_many({'1_0': {'name': 'item'}}, 2)
+        self.assertFalse(self.store.validate('1'))
+        self.assertTrue(self.store.validate('2'))
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.db_time, '2')
+
+    async def test_mass_info_uses_store(self):
+        simulator = MarketSimulator(latency=0, max_requests=50)
+        bot = make_client(simulator)
+        bot.item_store = self.store
+        self.assertFalse(await self.store.refresh(bot))
+        first = await bot.mass_info(ITEMS)
+        requests = simulator.requests
+        second = await bot.mass_info(ITEMS)
+        self.assertEqual(simulator.requests, requests)
+        self.assertEqual([item.market_name for item in second], [item.market_name for item in first])
+        # база предметов на маркете обновилась
+        simulator.db_time += 3600
+        self.assertTrue(await self.store.refresh(bot))
+        await bot.mass_info(ITEMS)
+        self.assertEqual(simulator.requests, requests + 2)
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
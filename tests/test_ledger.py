@@ -0,0 +1,99 @@
+import unittest
+
+from MarketCSGO.Exceptions import InsufficientFundsException, UnknownError
+from MarketCSGO.Item import Item
+from MarketCSGO.Ledger import BalanceLedger
+from .common import KEY, make_client
+
+A = (1, 0)
+B = (2, 0)
+
+
+def order(key, price: int) -> dict:
+    return {'i_classid': str(key[0]), 'i_instanceid': str(key[1]), 'o_price': f'{price}.00'}
+
+
+class BalanceLedgerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ledger = BalanceLedger()
+        self.ledger.sync(1000)
+
+    def test_reserve_and_commit(self):
+        self.assertEqual(self.ledger.reserve(A, 300), 0)
+        self.ledger.commit(A)
+        self.assertEqual(self.ledger.available, 700)
+        self.assertEqual(self.ledger.reserve(A, 500), 300)
+        self.ledger.commit(A)
+        self.assertEqual(self.ledger.available, 500)
+
+    def test_insufficient_funds(self):
+        self.ledger.reserve(A, 800)
+        with self.assertRaises(InsufficientFundsException):
+            self.ledger.reserve(B, 300)
+        self.assertEqual(self.ledger.reserved_total, 800)
+
+    def test_rollback(self):
+        self.ledger.reserve(A, 300)
+        self.ledger.commit(A)
+        previous = self.ledger.reserve(A, 900)
+        self.ledger.rollback(A, previous)
+        self.assertEqual(self.ledger.reserved, {A: 300})
+        self.assertEqual(self.ledger.available, 700)
+
+    def test_release(self):
+        self.ledger.reserve(A, 300)
+        self.ledger.commit(A)
+        self.ledger.release(A)
+        self.assertEqual(self.ledger.reserved, {})
+        self.assertEqual(self.ledger.available, 1000)
+
+    def test_load_orders_keeps_pending(self):
+        self.ledger.reserve(A, 300)
+        self.ledger.load_orders([order(B, 200)])
+        self.assertEqual(self.ledger.reserved, {A: 300, B: 200})
+        self.ledger.commit(A)
+        self.ledger.load_orders([order(A, 300)])
+        self.assertEqual(self.ledger.reserved, {A: 300})
+        self.assertEqual(self.ledger.reserved_total, 300)
+
+    def test_drift_needs_sync(self):
+        self.assertFalse(self.ledger.needs_sync)
+        self.ledger.mark_drift()
+        self.assertTrue(self.ledger.needs_sync)
+        self.ledger.sync(900)
+        self.assertFalse(self.ledger.needs_sync)
+
+
+class ClientLedgerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.bot = make_client()
+        self.simulator = self.bot.transport
+        await self.bot.get_money()
+        self.item = Item(A[0], A[1], 'Предмет', 'Item', 'hash')
+
+    async def asyncTearDown(self) -> None:
+        await self.bot.close()
+
+    async def test_order_reserves_funds(self):
+        self.assertTrue(await self.bot.insert_order(self.item, 300))
+        self.assertEqual(self.bot.ledger.available, self.simulator.initial_balance - 300)
+        await self.bot.get_orders()
+        self.assertEqual(self.bot.ledger.reserved, {A: 300})
+        self.assertFalse(self.bot.ledger.needs_sync)
+
+    async def test_server_rejection_marks_drift(self):
+        # деньги потрачены вне бота, локальный учет об этом не знает
+        self.simulator.balances[KEY] = 100
+        with self.assertRaises(UnknownError):
+            await self.bot.insert_order(self.item, 300)
+        self.assertEqual(self.bot.ledger.reserved, {})
+        self.assertTrue(self.bot.ledger.drift)
+        self.assertTrue(self.bot.ledger.needs_sync)
+        self.assertEqual(await self.bot.refresh_balance(), 100)
+        self.assertFalse(self.bot.ledger.needs_sync)
+
+
+if __name__ == '__main__':
+    unittest.main()
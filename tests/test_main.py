@@ -0,0 +1,63 @@
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+from MarketCSGO.Exceptions import BadAPIKeyException
+from MarketCSGO.Simulator import MarketSimulator
+from .common import KEY, make_client
+
+ITEMS = 40
+
+
+class MainLoopShutdownTest(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # main.py импортирует config.py через sys.path, подкладываем временный
+        cls.directory = tempfile.TemporaryDirectory()
+        items = [{'class_id': 1000 + i, 'instance_id': 0, 'price': 100} for i in range(ITEMS)]
+        with open(os.path.join(cls.directory.name, 'config.py'), 'w') as file:
+            file.write(f"API_KEY = {KEY!r}\nDEBUG = False\nMAIN_LOOP_DELAY = 5000\nITEMS_PURCHASE = {items!r}\n")
+        cls.saved = {name: sys.modules.pop(name) for name in ('config', 'main') if name in sys.modules}
+        sys.path.insert(0, cls.directory.name)
+        cls.main = importlib.import_module('main')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        sys.path.remove(cls.directory.name)
+        for name in ('config', 'main'):
+            sys.modules.pop(name, None)
+        sys.modules.update(cls.saved)
+        cls.directory.cleanup()
+
+    async def test_cancel_reports_pending_orders(self):
+        simulator = MarketSimulator(latency=0.2)
+        bot = make_client(simulator, rate=4)
+        loop = asyncio.ensure_future(self.main.main_loop(bot))
+        await asyncio.sleep(3)
+        self.assertGreater(bot.limiter.queue_depth, 0)
+        loop.cancel()
+        report = await loop
+        placed = len(simulator.orders.get(KEY, {}))
+        self.assertTrue(report.offline)
+        self.assertFalse(simulator.online[KEY])
+        self.assertGreater(len(report.aborted_orders), 0)
+        self.assertEqual(placed + len(report.aborted_orders), ITEMS)
+        self.assertTrue(all(price == 100 for item, price in report.aborted_orders))
+        await bot.close()
+
+    async def test_startup_error_stops_scheduler(self):
+        simulator = MarketSimulator(latency=0, keys={'other'})
+        bot = make_client(simulator)
+        with self.assertRaises(BadAPIKeyException):
+            await self.main.main_loop(bot)
+        self.assertTrue(bot.closing)
+        self.assertEqual([task for task in asyncio.all_tasks() if task is not asyncio.current_task()], [])
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from MarketCSGO.Item import Item
+from MarketCSGO.OrderBook import OrderBook
+from MarketCSGO.Simulator import MarketSimulator
+from .common import KEY, make_client
+
+
+def order(class_id: int, price: int) -> dict:
+    return {'i_classid': str(class_id), 'i_instanceid': '0', 'o_price': f'{price}.00',
+            'i_market_name': f'Item {class_id}', 'i_market_hash_name': f'Item {class_id}', 'i_hash': ''}
+
+
+class OrderBookDiffTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.items = {class_id: Item(class_id, 0, f'Item {class_id}', f'Item {class_id}', '')
+                      for class_id in range(1, 5)}
+        self.book = OrderBook()
+        for class_id in (1, 2, 3):
+            self.book.set(self.items[class_id], 100 * class_id)
+
+    def test_diff(self):
+        diff = self.book.diff([order(1, 100), order(2, 150), order(4, 400)])
+        self.assertEqual([(item.class_id, price) for item, price in diff.insert], [(3, 300)])
+        self.assertEqual([(item.class_id, price) for item, price in diff.update], [(2, 200)])
+        self.assertEqual([item.class_id for item in diff.delete], [4])
+
+    def test_in_sync(self):
+        self.assertFalse(self.book.diff([order(1, 100), order(2, 200), order(3, 300)]))
+
+    def test_keep_unknown(self):
+        book = OrderBook(delete_unknown=False)
+        book.set(self.items[1], 100)
+        diff = book.diff([order(1, 100), order(4, 400)])
+        self.assertFalse(diff)
+        self.book.remove(self.items[3])
+        self.assertEqual([item.class_id for item in self.book.diff([order(3, 300)]).delete], [3])
+
+
+class OrderBookSyncTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.simulator = MarketSimulator(latency=0, max_requests=50)
+        self.bot = make_client(self.simulator)
+        self.bot.balance = 10 ** 9
+        self.book = OrderBook()
+
+    async def asyncTearDown(self) -> None:
+        await self.bot.close()
+
+    def item(self, class_id: int) -> Item:
+        info = self.simulator.item_info(class_id, 0)
+        return Item(class_id, 0, info['market_name'], info['market_hash_name'], info['hash'])
+
+    async def test_sync_reaches_desired_state(self):
+        self.simulator.orders[KEY] = {(1001, 0): 500, (1002, 0): 700}
+        self.book.set(self.item(1000), 300)
+        self.book.set(self.item(1001), 600)
+        diff = await self.book.sync(self.bot)
+        self.assertEqual((len(diff.insert), len(diff.update), len(diff.delete)), (1, 1, 1))
+        self.assertEqual(self.simulator.orders[KEY], {(1000, 0): 300, (1001, 0): 600})
+        self.assertFalse(await self.book.sync(self.bot))
+
+    async def test_apply_order(self):
+        calls = []
+        for name in ('delete_orders', 'update_orders', 'insert_orders'):
+            method = getattr(self.bot, name)
+
+            async def record(orders, *args, name=name, method=method, **kwargs):
+                calls.append(name)
+                return await method(orders, *args, **kwargs)
+
+            setattr(self.bot, name, record)
+        self.simulator.orders[KEY] = {(1001, 0): 500, (1002, 0): 700}
+        self.book.set(self.item(1000), 300)
+        self.book.set(self.item(1001), 600)
+        await self.book.sync(self.bot)
+        self.assertEqual(calls, ['delete_orders', 'update_orders', 'insert_orders'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from MarketCSGO.Pool import CSGOMarketPool
+from MarketCSGO.RateLimiter import RateLimiter
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+KEYS = ('a', 'b', 'c')
+
+
+def watchlist(size: int) -> list:
+    return [{'class_id': 1000 + i, 'instance_id': 0} for i in range(size)]
+
+
+class MassInfoTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.simulator = MarketSimulator(latency=0.001, max_requests=50, seed=1)
+        self.pool = CSGOMarketPool(KEYS, self.simulator)
+        for client in self.pool:
+            client.limiter = RateLimiter(50)
+
+    async def asyncTearDown(self) -> None:
+        await self.pool.close()
+
+    async def test_client_keeps_order(self):
+        bot = make_client(self.simulator)
+        items = await bot.mass_info(watchlist(250), info=1)
+        self.assertEqual([item.class_id for item in items], [1000 + i for i in range(250)])
+
+    async def test_pool_keeps_order_and_spreads_batches(self):
+        items = await self.pool.mass_info(watchlist(300), info=1)
+        self.assertEqual([item.class_id for item in items], [1000 + i for i in range(300)])
+        self.assertEqual([client.limiter.acquired for client in self.pool], [1, 1, 1])
+
+    async def test_pool_iter(self):
+        items = [item async for item in self.pool.mass_info_iter(watchlist(250), info=1)]
+        self.assertEqual(sorted(item.class_id for item in items), [1000 + i for i in range(250)])
+
+    async def test_default_transport_fits_all_keys(self):
+        pool = CSGOMarketPool(KEYS)
+        self.assertEqual(pool.transport.limit, 4 * len(KEYS))
+        await pool.close()
+
+    async def test_pool_checks_args(self):
+        with self.assertRaises(AttributeError):
+            await self.pool.mass_info(watchlist(1), sell=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
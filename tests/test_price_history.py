@@ -0,0 +1,78 @@
+import unittest
+
+from MarketCSGO.PriceHistory import PriceHistory, PriceSeries
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+
+class PriceSeriesTest(unittest.TestCase):
+
+    def test_overlapping_windows(self):
+        series = PriceSeries()
+        self.assertEqual(series.ingest([(3, 30), (1, 10), (2, 20)]), 3)
+        # следующий ответ снова содержит старые сделки
+        self.assertEqual(series.ingest([(2, 20), (3, 30), (4, 40), (5, 50)]), 2)
+        self.assertEqual(series.ingest([(4, 40), (5, 50)]), 0)
+        self.assertEqual(list(series.times), [1, 2, 3, 4, 5])
+        self.assertEqual(list(series.prices), [10, 20, 30, 40, 50])
+
+    def test_same_timestamp_duplicates(self):
+        series = PriceSeries()
+        self.assertEqual(series.ingest([(1, 10), (2, 20), (2, 20)]), 3)
+        # две сделки по 20 уже известны, третья с тем же временем новая, как и сделка по 25
+        self.assertEqual(series.ingest([(2, 20), (2, 20), (2, 20), (2, 25)]), 2)
+        self.assertEqual(series.ingest([(2, 20), (2, 20), (2, 20), (2, 25)]), 0)
+        self.assertEqual(series.ingest([(3, 30), (2, 20)]), 1)
+        self.assertEqual(list(series.prices), [10, 20, 20, 20, 25, 30])
+
+    def test_statistics(self):
+        series = PriceSeries()
+        self.assertIsNone(series.vwap())
+        self.assertIsNone(series.percentile(50))
+        series.ingest((time, price) for time, price in enumerate([40, 10, 30, 20]))
+        self.assertEqual(series.vwap(), 25)
+        self.assertEqual(series.vwap(2), 25)
+        self.assertEqual(series.vwap(1), 20)
+        self.assertEqual(series.percentile(0), 10)
+        self.assertEqual(series.percentile(100), 40)
+        self.assertEqual(series.percentile(50), 25)
+        self.assertEqual(series.percentile(50, n=3), 20)
+        with self.assertRaises(AttributeError):
+            series.percentile(101)
+
+    def test_rolling(self):
+        series = PriceSeries()
+        series.ingest((time, price) for time, price in enumerate([5, 3, 4, 1, 2, 6]))
+        self.assertEqual(list(series.rolling_min(3)), [5, 3, 3, 1, 1, 1])
+        self.assertEqual(list(series.rolling_max(3)), [5, 5, 5, 4, 4, 6])
+        self.assertEqual(list(series.rolling_min(1)), [5, 3, 4, 1, 2, 6])
+        with self.assertRaises(AttributeError):
+            series.rolling_max(0)
+
+
+class PriceHistoryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_refresh(self):
+        simulator = MarketSimulator(latency=0, max_requests=50)
+        bot = make_client(simulator)
+        history = PriceHistory()
+        item = {'class_id': 1000, 'instance_id': 0}
+        self.assertEqual(await history.refresh(bot, item), 500)
+        self.assertEqual(await history.refresh(bot, item), 0)
+        self.assertIn(item, history)
+        self.assertEqual(list(history.get(item).times), sorted(history.get(item).times))
+        await bot.close()
+
+    def test_market_history(self):
+        history = PriceHistory()
+        deals = [{'classid': '1', 'instanceid': '0', 'time': '10', 'price': '100'},
+                 {'classid': '2', 'instanceid': '0', 'time': '11', 'price': '200.0'},
+                 {'classid': '1', 'instanceid': '0', 'time': '12', 'price': '110'}]
+        self.assertEqual(history.ingest_market_history(deals), 3)
+        self.assertEqual(history.ingest_market_history({str(i): deal for i, deal in enumerate(deals)}), 0)
+        self.assertEqual(list(history.get({'class_id': 1, 'instance_id': 0}).prices), [100, 110])
+        self.assertEqual(len(history), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
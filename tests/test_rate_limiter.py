@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+
+from MarketCSGO.Exceptions import ShutdownError
+from MarketCSGO.RateLimiter import Priority, RateLimiter
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+PERIOD = 0.02
+
+
+class RateLimiterTest(unittest.IsolatedAsyncioTestCase):
+
+    async def _enqueue(self, limiter: RateLimiter, priorities, served: list) -> list:
+        async def waiter(index: int, priority: Priority) -> None:
+            await limiter.acquire(priority)
+            served.append(index)
+            limiter.release()
+
+        tasks = [asyncio.ensure_future(waiter(i, p)) for i, p in enumerate(priorities)]
+        await asyncio.sleep(0)
+        return tasks
+
+    async def test_priority_order(self):
+        limiter = RateLimiter(1, PERIOD)
+        self.assertTrue(limiter.acquire_nowait())
+        served = []
+        priorities = [Priority.BULK, Priority.DEFAULT, Priority.BULK, Priority.CRITICAL, Priority.TRADE]
+        tasks = await self._enqueue(limiter, priorities, served)
+        self.assertEqual(limiter.queue_depth, 5)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(served, [3, 4, 1, 0, 2])
+        self.assertEqual(limiter.queue_depth, 0)
+
+    async def test_slot_is_taken_until_release(self):
+        limiter = RateLimiter(1, PERIOD)
+        self.assertTrue(limiter.acquire_nowait())
+        self.assertIsNone(limiter.delay())
+        await asyncio.sleep(PERIOD * 2)
+        self.assertFalse(limiter.acquire_nowait(Priority.CRITICAL))
+        limiter.release()
+        self.assertFalse(limiter.acquire_nowait(Priority.CRITICAL))
+        await asyncio.sleep(PERIOD * 1.5)
+        self.assertTrue(limiter.acquire_nowait())
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        limiter = RateLimiter(1, PERIOD)
+        limiter.acquire_nowait()
+        served = []
+        cancelled, kept = await self._enqueue(limiter, [Priority.TRADE, Priority.BULK], served)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.queue_depth, 1)
+        limiter.release()
+        await kept
+        self.assertEqual(served, [1])
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    async def test_cancel_waiting(self):
+        limiter = RateLimiter(1, PERIOD)
+        limiter.acquire_nowait()
+        served = []
+        trade, default, bulk = await self._enqueue(limiter, [Priority.TRADE, Priority.DEFAULT, Priority.BULK], served)
+        cancelled = limiter.cancel_waiting(Priority.DEFAULT, ShutdownError)
+        self.assertEqual(cancelled, {Priority.DEFAULT: 1, Priority.BULK: 1})
+        self.assertEqual(limiter.queue_depth, 1)
+        for task in (default, bulk):
+            with self.assertRaises(ShutdownError):
+                await task
+        limiter.release()
+        await trade
+        self.assertEqual(served, [0])
+
+    async def test_reserved_slot_for_critical(self):
+        limiter = RateLimiter(4, PERIOD)
+        for _ in range(3):
+            self.assertTrue(limiter.acquire_nowait(Priority.BULK))
+        self.assertFalse(limiter.acquire_nowait(Priority.TRADE))
+        self.assertEqual(limiter.free_slots(Priority.DEFAULT), 0)
+        self.assertEqual(limiter.free_slots(Priority.CRITICAL), 1)
+        self.assertEqual(limiter.delay(Priority.CRITICAL), 0.0)
+        self.assertIsNone(limiter.delay(Priority.DEFAULT))
+        # слоты BULK в пути не освобождаются, CRITICAL получает резервный без ожидания
+        self.assertEqual(await asyncio.wait_for(limiter.acquire(Priority.CRITICAL), PERIOD), 0.0)
+        self.assertFalse(limiter.acquire_nowait(Priority.CRITICAL))
+
+    async def test_queued_critical_waits_at_most_one_period(self):
+        limiter = RateLimiter(4, PERIOD)
+        for _ in range(3):
+            self.assertTrue(limiter.acquire_nowait(Priority.BULK))
+        self.assertTrue(limiter.acquire_nowait(Priority.CRITICAL))
+        limiter.release()
+        waited = await asyncio.wait_for(limiter.acquire(Priority.CRITICAL), PERIOD * 3)
+        self.assertLessEqual(waited, PERIOD * 1.5)
+
+    async def test_single_slot_is_not_reserved(self):
+        limiter = RateLimiter(1, PERIOD)
+        self.assertEqual(limiter.reserved, 0)
+        self.assertTrue(limiter.acquire_nowait(Priority.BULK))
+
+    async def test_simulator_limit_is_never_exceeded(self):
+        simulator = MarketSimulator(latency=0.005, jitter=0.01, max_requests=10, period=0.2, seed=1)
+        bot = make_client(simulator, rate=10)
+        bot.limiter = RateLimiter(10, 0.2)
+        results = await asyncio.gather(*(bot.get_money() for _ in range(40)))
+        self.assertEqual(len(results), 40)
+        self.assertEqual(simulator.rate_limited, 0)
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from MarketCSGO.Replay import RecordingTransport, ReplayMissError, ReplayTransport
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+ITEMS = [{'class_id': 1000 + i, 'instance_id': 0} for i in range(3)]
+
+
+class RecordReplayTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'session.jsonl.gz')
+
+    async def asyncTearDown(self) -> None:
+        self.directory.cleanup()
+
+    @staticmethod
+    async def session(bot) -> tuple:
+        balance = await bot.get_money()
+        items = await bot.mass_info(ITEMS)
+        inserted = await bot.insert_order(items[0], 100)
+        orders = await bot.get_orders()
+        offline = await bot.go_offline()
+        return balance, [(item.class_id, item.market_name) for item in items], inserted, orders, offline
+
+    async def test_round_trip(self):
+        recorder = RecordingTransport(MarketSimulator(latency=0.01, max_requests=50), self.path)
+        bot = make_client(recorder)
+        recorded = await self.session(bot)
+        await bot.close()
+        self.assertEqual(recorder.records, 5)
+
+        replay = ReplayTransport(self.path, latency_scale=0, strict=True)
+        bot = make_client(replay)
+        self.assertEqual(await self.session(bot), recorded)
+        self.assertEqual(replay.stats(), {'replayed': 5, 'repeated': 0, 'left': 0})
+        with self.assertRaises(ReplayMissError):
+            await bot.get_money()
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
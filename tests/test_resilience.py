@@ -0,0 +1,89 @@
+import asyncio
+import time
+import unittest
+
+from MarketCSGO.Exceptions import BadGatewayError
+from MarketCSGO.RateLimiter import Priority
+from MarketCSGO.Resilience import CircuitBreaker, RetryPolicy
+from MarketCSGO.Simulator import MarketSimulator
+from .common import make_client
+
+RESET = 0.05
+
+
+class CircuitBreakerTest(unittest.IsolatedAsyncioTestCase):
+
+    def _open(self) -> CircuitBreaker:
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET)
+        for _ in range(3):
+            self.assertFalse(breaker.is_open)
+            breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        return breaker
+
+    async def test_opens_after_threshold(self):
+        breaker = self._open()
+        self.assertEqual(breaker.trips, 1)
+        breaker.record_failure()
+        self.assertEqual(breaker.trips, 1)
+
+    async def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertFalse(breaker.is_open)
+
+    async def test_critical_passes_open_breaker(self):
+        breaker = self._open()
+        self.assertFalse(await asyncio.wait_for(breaker.wait(Priority.CRITICAL), RESET / 2))
+
+    async def test_single_probe_closes_breaker(self):
+        breaker = self._open()
+        started = time.monotonic()
+        self.assertTrue(await breaker.wait(Priority.DEFAULT))
+        self.assertGreaterEqual(time.monotonic() - started, RESET * 0.9)
+        other = asyncio.ensure_future(breaker.wait(Priority.BULK))
+        await asyncio.sleep(RESET / 5)
+        self.assertFalse(other.done())
+        breaker.record_success()
+        self.assertFalse(await asyncio.wait_for(other, RESET))
+        self.assertFalse(breaker.is_open)
+
+    async def test_failed_probe_reopens(self):
+        breaker = self._open()
+        self.assertTrue(await breaker.wait(Priority.DEFAULT))
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        self.assertEqual(breaker.trips, 1)
+        started = time.monotonic()
+        self.assertTrue(await breaker.wait(Priority.DEFAULT))
+        self.assertGreaterEqual(time.monotonic() - started, RESET * 0.9)
+
+    async def test_cancelled_probe_is_replaced(self):
+        breaker = self._open()
+        self.assertTrue(await breaker.wait(Priority.DEFAULT))
+        other = asyncio.ensure_future(breaker.wait(Priority.DEFAULT))
+        await asyncio.sleep(0)
+        breaker.end_probe()
+        self.assertTrue(await asyncio.wait_for(other, RESET))
+
+    async def test_client_against_unavailable_api(self):
+        simulator = MarketSimulator(latency=0, error_rate=1.0, max_requests=50, seed=1)
+        bot = make_client(simulator)
+        bot.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=RESET)
+        bot.default_retry_policy = RetryPolicy(max_attempts=2, base_delay=0.001)
+        with self.assertRaises(BadGatewayError):
+            await bot.get_money()
+        self.assertTrue(bot.breaker.is_open)
+        simulator.error_rate = 0
+        started = time.monotonic()
+        self.assertEqual(await bot.get_money(), simulator.initial_balance)
+        self.assertGreaterEqual(time.monotonic() - started, RESET * 0.5)
+        self.assertFalse(bot.breaker.is_open)
+        await bot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
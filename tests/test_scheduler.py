@@ -0,0 +1,41 @@
+import asyncio
+import contextlib
+import itertools
+import unittest
+
+from MarketCSGO.Scheduler import Scheduler
+
+
+class SchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cancel_while_job_finishes(self):
+        scheduler = Scheduler()
+        scheduler.add('fast', lambda: asyncio.sleep(0), 0.001)
+        runner = asyncio.ensure_future(scheduler.run())
+        for _ in range(50):
+            await asyncio.sleep(0)
+        runner.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await asyncio.wait_for(runner, 1)
+        self.assertTrue(runner.cancelled())
+
+    async def test_slow_run_misses_deadline(self):
+        durations = itertools.chain([0, 0.2], itertools.repeat(0))
+
+        async def ping() -> None:
+            await asyncio.sleep(next(durations))
+
+        scheduler = Scheduler()
+        job = scheduler.add('ping', ping, 0.05, deadline=0.1)
+        runner = asyncio.ensure_future(scheduler.run())
+        # второй запуск начинается вовремя, но завершается позже deadline
+        await asyncio.sleep(0.4)
+        runner.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await runner
+        self.assertGreaterEqual(job.runs, 2)
+        self.assertEqual(job.missed_deadlines, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from MarketCSGO.TradeFeed import TradeFeed
+
+
+def deals(ids) -> list:
+    """Ответ history: сделки от новых к старым."""
+    return [{'id': str(i), 'classid': '1000', 'instanceid': '0', 'price': '100', 'time': str(1000 + i)}
+            for i in reversed(list(ids))]
+
+
+class FakeAPI:
+
+    def __init__(self, *responses) -> None:
+        self.responses = list(responses)
+
+    async def market_history(self):
+        return self.responses.pop(0)
+
+
+class TradeFeedTest(unittest.IsolatedAsyncioTestCase):
+
+    def test_seen_size_is_checked(self):
+        with self.assertRaises(AttributeError):
+            TradeFeed(FakeAPI(), seen_size=TradeFeed.HISTORY_SIZE)
+
+    def test_new_trades_from_oldest(self):
+        feed = TradeFeed(FakeAPI())
+        self.assertEqual([trade.id for trade in feed.extract_new(deals(range(1, 4)))], ['1', '2', '3'])
+        self.assertEqual([trade.id for trade in feed.extract_new(deals(range(2, 6)))], ['4', '5'])
+
+    def test_seen_set_is_bounded(self):
+        feed = TradeFeed(FakeAPI(), seen_size=60)
+        feed.extract_new(deals(range(1, 51)))
+        feed.extract_new(deals(range(51, 101)))
+        self.assertEqual(len(feed.seen), 60)
+        # самые старые id вытеснены и снова считаются новыми
+        self.assertEqual([trade.id for trade in feed.extract_new(deals(range(31, 81)))],
+                         [str(i) for i in range(31, 41)])
+
+    async def test_gap_counting(self):
+        feed = TradeFeed(FakeAPI(deals(range(1, 51)), deals(range(51, 101)), deals(range(81, 131)),
+                                 deals(range(131, 141))))
+        for _ in range(4):
+            await feed.poll()
+        # первый опрос не пропуск, второй полностью новый, третий пересекается, в четвертом меньше 50 сделок
+        self.assertEqual(feed.stats()['gaps'], 1)
+        self.assertEqual(feed.stats()['trades'], 140)
+
+    async def test_subscribers(self):
+        feed = TradeFeed(FakeAPI(deals(range(1, 3))))
+        received = []
+
+        def broken(trade):
+            raise ValueError(trade.id)
+
+        async def collect(trade):
+            received.append(trade.id)
+
+        feed.subscribe(broken)
+        feed.subscribe(collect)
+        self.assertTrue(await feed.poll())
+        self.assertEqual(received, ['1', '2'])
+
+    async def test_stream_drops_oldest(self):
+        feed = TradeFeed(FakeAPI(deals(range(1, 6))))
+        with feed.stream(maxsize=2) as stream:
+            await feed.poll()
+            self.assertEqual(feed.stats()['dropped'], 3)
+            self.assertEqual([(await stream.__anext__()).id for _ in range(2)], ['4', '5'])
+        self.assertEqual(feed.streams, [])
+
+    async def test_stream_blocks_poll(self):
+        feed = TradeFeed(FakeAPI(deals(range(1, 6))))
+        with feed.stream(maxsize=2, block=True) as stream:
+            poll = asyncio.ensure_future(feed.poll())
+            await asyncio.sleep(0.01)
+            self.assertFalse(poll.done())
+            received = [(await stream.__anext__()).id for _ in range(5)]
+            await poll
+        self.assertEqual(received, ['1', '2', '3', '4', '5'])
+        self.assertEqual(feed.stats()['dropped'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
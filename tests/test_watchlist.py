@@ -0,0 +1,38 @@
+import unittest
+
+from MarketCSGO.Simulator import MarketSimulator
+from MarketCSGO.Watchlist import WatchlistMonitor
+from .common import make_client
+
+ITEMS = [{'class_id': 1000 + i, 'instance_id': 0} for i in range(150)]
+
+
+class WatchlistMonitorTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.simulator = MarketSimulator(latency=0, max_requests=50)
+        self.bot = make_client(self.simulator)
+        self.monitor = WatchlistMonitor(self.bot, ITEMS)
+
+    async def asyncTearDown(self) -> None:
+        await self.bot.close()
+
+    async def test_get(self):
+        self.assertEqual(self.monitor.get(ITEMS[0]), (None, None))
+        self.assertEqual(self.monitor.get({'class_id': 5000, 'instance_id': 0}), (None, None))
+        await self.monitor.poll_batch()
+        ask, bid = self.monitor.get(ITEMS[0])
+        self.assertEqual(ask, MarketSimulator.base_price(1000, 0))
+        self.assertIsNotNone(bid)
+        self.assertEqual(self.monitor.get(ITEMS[-1]), (None, None))
+
+    async def test_batches_in_turn(self):
+        self.assertEqual(self.monitor.batches, 2)
+        changes = [await self.monitor.poll_batch() for _ in range(3)]
+        self.assertEqual(changes, [[], [], []])
+        self.assertIsNotNone(self.monitor.get(ITEMS[-1])[0])
+        self.assertEqual(self.monitor.stats()['polls'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()